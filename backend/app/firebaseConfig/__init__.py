@@ -1,6 +1,7 @@
 from .firebase_config import (
     initialize_firebase, 
     get_firestore_client, 
+    get_firestore_async_client,
     get_auth_client,
     verify_firebase_token,
     get_user_by_uid,
@@ -12,6 +13,7 @@ from .firebase_config import (
 __all__ = [
     "initialize_firebase", 
     "get_firestore_client", 
+    "get_firestore_async_client",
     "get_auth_client",
     "verify_firebase_token",
     "get_user_by_uid",
@@ -1,6 +1,6 @@
 import os
 import firebase_admin
-from firebase_admin import credentials, firestore, auth
+from firebase_admin import credentials, firestore, firestore_async, auth
 from typing import Optional
 import logging
 
@@ -8,6 +8,7 @@ logger = logging.getLogger(__name__)
 
 # Global variables to store Firebase clients
 _firestore_client: Optional[firestore.Client] = None
+_firestore_async_client = None
 _auth_client: Optional[auth.Client] = None
 
 
@@ -54,6 +55,18 @@ def get_firestore_client() -> firestore.Client:
     return _firestore_client
 
 
+def get_firestore_async_client():
+    """Get Firestore AsyncClient instance"""
+    global _firestore_async_client
+    
+    if _firestore_async_client is None:
+        if not firebase_admin._apps:
+            initialize_firebase()
+        _firestore_async_client = firestore_async.client()
+    
+    return _firestore_async_client
+
+
 def get_auth_client() -> auth.Client:
     """Get Firebase Auth client instance"""
     global _auth_client
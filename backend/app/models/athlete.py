@@ -1,6 +1,6 @@
 from datetime import date
 from typing import Optional, List, Literal
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ConfigDict
 from .base import BaseModelWithID
 
 
@@ -67,6 +67,11 @@ class AthleteSearchFilters(BaseModel):
     limit: int = Field(default=20, ge=1, le=100)
     offset: int = Field(default=0, ge=0)
 
+    model_config = ConfigDict(
+        # Frozen filters are hashable and can be used directly as cache keys
+        frozen=True
+    )
+
 
 class AthleteAnalytics(BaseModel):
     """Model for athlete analytics"""
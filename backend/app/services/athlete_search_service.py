@@ -1,11 +1,13 @@
 """
 Athlete Search Service - Handles search, filtering, and pagination for athletes
 """
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple, FrozenSet
 import logging
+import asyncio
+import re
 import time
-import hashlib
 import threading
+from collections import deque
 from datetime import date, datetime
 from dateutil.relativedelta import relativedelta
 
@@ -19,10 +21,21 @@ from firebase_admin.firestore import FieldFilter
 
 logger = logging.getLogger(__name__)
 
+# Characters stripped from every free-text search input
+DANGEROUS_CHARS = ['<', '>', '"', "'", '&', ';', '(', ')', '{', '}', '[', ']', '\\', '/']
+DANGEROUS_CHARS_TABLE = str.maketrans('', '', ''.join(DANGEROUS_CHARS))
+
 
 class AthleteSearchService:
     """Service for searching and filtering athletes"""
     
+    # Filter field -> position in query, most selective first
+    _FIELD_PRIORITY = {
+        field: priority for priority, field in enumerate(
+            ['is_active', 'primary_sport_category_id', 'position', 'gender', 'location']
+        )
+    }
+    
     def __init__(self, environment: str = None):
         self.config = get_athlete_config()
         self._validate_config()
@@ -33,6 +46,23 @@ class AthleteSearchService:
         self.performance_config = self.config.get('performance', {})
         self.security_config = self.config.get('security', {})
         
+        # Unpack settings read on every request into plain attributes once
+        self._default_limit = self.search_limits['default_limit']
+        self._max_limit = self.search_limits['max_limit']
+        self._max_offset = self.search_limits['max_offset']
+        self._log_search_queries = self.logging_config.get('log_search_queries', False)
+        self._log_query_performance = self.logging_config.get('log_query_performance', False)
+        self._caching_enabled = self.performance_config.get('enable_caching', False)
+        self._query_optimization_enabled = self.performance_config.get('enable_query_optimization', False)
+        self._max_query_timeout = self.performance_config.get('max_query_timeout', 30)
+        self._audit_logging_enabled = self.security_config.get('enable_audit_logging', False)
+        
+        # Precompute security lookups up front
+        self._sanitization_enabled = bool(self.security_config.get('enable_sanitization', True))
+        self._max_string_length = self.security_config.get('max_string_length', 1000)
+        self._allowed_genders: FrozenSet[str] = frozenset(self.security_config.get('allowed_genders', ['male', 'female', 'other']))
+        self._blocked_pattern_re: Optional[re.Pattern] = self._compile_blocked_patterns(self.security_config.get('blocked_patterns', []))
+        
         # Initialize repositories
         self.athlete_repository = DatabaseService(self.collections["athlete_profiles"])
         
@@ -41,16 +71,22 @@ class AthleteSearchService:
             max_connections=self.performance_config.get('max_concurrent_queries', 5)
         )
         
-        # Initialize caching with thread safety
-        self._query_cache = {}
+        # Bound the number of in-flight database queries
+        self._query_semaphore = asyncio.Semaphore(self.performance_config.get('max_concurrent_queries', 5))
+        
+        # Initialize caching; entries are (data, monotonic_ns timestamp) tuples.
+        # Writers serialize on the lock, readers don't need it
+        self._query_cache: Dict[AthleteSearchFilters, Tuple[PaginatedResponse, int]] = {}
         self.cache_ttl = self.performance_config.get('cache_ttl_seconds', 3600)
+        # Entries are stamped with time.monotonic_ns(), so compare against the TTL in ns
+        self._cache_ttl_ns = int(self.cache_ttl * 1_000_000_000)
         self.max_cache_size = self.performance_config.get('cache_size', 128)
         self._cache_lock = threading.Lock()
         
         # Initialize performance monitor
         self.performance_monitor = PerformanceMonitor(
             threshold_ms=int(self.logging_config.get('slow_query_threshold', 1.0) * 1000),
-            enable_logging=self.logging_config.get('log_query_performance', False)
+            enable_logging=self._log_query_performance
         )
         
         # Performance monitoring
@@ -59,7 +95,8 @@ class AthleteSearchService:
             'cache_hits': 0,
             'cache_misses': 0,
             'total_query_time': 0.0,
-            'query_times': []
+            # Most recent query times; older ones drop off automatically
+            'query_times': deque(maxlen=1000)
         }
     
     def _validate_config(self):
@@ -117,81 +154,87 @@ class AthleteSearchService:
                 'enable_audit_logging': True
             }
     
+    @staticmethod
+    def _compile_blocked_patterns(blocked_patterns: List[str]) -> Optional[re.Pattern]:
+        """Build a single case-insensitive regex matching any blocked pattern"""
+        # Longest patterns first so e.g. 'javascript' wins over 'script'
+        alternatives = [re.escape(pattern) for pattern in sorted(blocked_patterns, key=len, reverse=True) if pattern]
+        if not alternatives:
+            return None
+        return re.compile('|'.join(alternatives), re.IGNORECASE)
+    
     def _sanitize_search_input(self, value: str) -> str:
         """Sanitize search input to prevent injection attacks"""
         if not value or not isinstance(value, str):
             return value
         
-        # Remove potentially dangerous characters
-        dangerous_chars = ['<', '>', '"', "'", '&', ';', '(', ')', '{', '}', '[', ']', '\\', '/']
-        sanitized = value
-        for char in dangerous_chars:
-            sanitized = sanitized.replace(char, '')
+        # Limit length first so oversized input is never scanned in full
+        sanitized = value[:self._max_string_length]
+        if not self._sanitization_enabled:
+            return sanitized
         
-        # Check for blocked patterns
-        blocked_patterns = self.security_config.get('blocked_patterns', [])
-        for pattern in blocked_patterns:
-            if pattern.lower() in sanitized.lower():
-                sanitized = sanitized.replace(pattern, '')
+        # Remove potentially dangerous characters in a single C-level pass
+        sanitized = sanitized.translate(DANGEROUS_CHARS_TABLE)
         
-        # Limit length
-        max_length = self.security_config.get('max_string_length', 1000)
-        if len(sanitized) > max_length:
-            sanitized = sanitized[:max_length]
+        # Strip blocked patterns, repeating only if a removal spliced a new
+        # blocked pattern together (e.g. "scrscriptipt")
+        if self._blocked_pattern_re is not None:
+            sanitized, removed = self._blocked_pattern_re.subn('', sanitized)
+            while removed:
+                sanitized, removed = self._blocked_pattern_re.subn('', sanitized)
         
         return sanitized.strip()
     
     def _validate_and_sanitize_filters(self, filters: AthleteSearchFilters) -> AthleteSearchFilters:
         """Validate and sanitize all filter inputs"""
-        # Create a copy to avoid modifying original
-        sanitized_filters = filters.copy()
+        # Filters are frozen, so collect sanitized values and copy once
+        updates = {}
         
         # Sanitize string fields
-        if sanitized_filters.sport_category_id:
-            sanitized_filters.sport_category_id = self._sanitize_search_input(sanitized_filters.sport_category_id)
-        
-        if sanitized_filters.position:
-            sanitized_filters.position = self._sanitize_search_input(sanitized_filters.position)
+        if self._sanitization_enabled:
+            if filters.sport_category_id:
+                updates['sport_category_id'] = self._sanitize_search_input(filters.sport_category_id)
+            
+            if filters.position:
+                updates['position'] = self._sanitize_search_input(filters.position)
+            
+            if filters.location:
+                updates['location'] = self._sanitize_search_input(filters.location)
         
-        if sanitized_filters.location:
-            sanitized_filters.location = self._sanitize_search_input(sanitized_filters.location)
+        sanitized_filters = filters.model_copy(update=updates) if updates else filters
         
         # Validate gender against allowed values
         if sanitized_filters.gender:
-            if sanitized_filters.gender not in self.security_config.get('allowed_genders', []):
+            if sanitized_filters.gender not in self._allowed_genders:
                 raise InputValidationError(f"Invalid gender value: {sanitized_filters.gender}")
         
         return sanitized_filters
     
-    def _get_cache_key(self, filters: AthleteSearchFilters) -> str:
+    def _get_cache_key(self, filters: AthleteSearchFilters) -> AthleteSearchFilters:
         """Generate cache key for search filters"""
-        filter_dict = filters.dict()
-        # Remove timestamp-sensitive fields for consistent caching
-        filter_dict.pop('timestamp', None)
-        filter_str = str(sorted(filter_dict.items()))
-        return hashlib.md5(filter_str.encode()).hexdigest()
+        # Search filters are frozen and hash field-wise, so they key the cache directly
+        return filters
     
     def _clean_cache(self):
         """Clean expired cache entries and maintain size limit with thread safety"""
         with self._cache_lock:
-            current_time = time.time()
-            expired_keys = [key for key, value in self._query_cache.items() 
-                           if current_time - value['timestamp'] > self.cache_ttl]
-            
-            for key in expired_keys:
-                del self._query_cache[key]
-            
-            # If still over limit, remove oldest entries
-            if len(self._query_cache) > self.max_cache_size:
-                sorted_items = sorted(self._query_cache.items(), 
-                                    key=lambda x: x[1]['timestamp'])
-                items_to_remove = len(self._query_cache) - self.max_cache_size
-                for i in range(items_to_remove):
-                    del self._query_cache[sorted_items[i][0]]
+            current_time = time.monotonic_ns()
+            # Entries are kept in insertion order, which is also timestamp order,
+            # so expired and surplus entries are always at the front
+            while self._query_cache:
+                oldest_key = next(iter(self._query_cache))
+                if (len(self._query_cache) <= self.max_cache_size and
+                        current_time - self._query_cache[oldest_key][1] <= self._cache_ttl_ns):
+                    break
+                del self._query_cache[oldest_key]
     
     def _log_audit_event(self, event_type: str, user_id: str = None, details: Dict[str, Any] = None):
         """Log audit events for security monitoring"""
-        if not self.security_config.get('enable_audit_logging', False):
+        if not self._audit_logging_enabled:
+            return
+        
+        # Skip building and formatting the record when INFO is filtered out
+        if not logger.isEnabledFor(logging.INFO):
             return
         
         audit_data = {
@@ -202,22 +245,19 @@ class AthleteSearchService:
             'details': details or {}
         }
         
-        logger.info(f"AUDIT: {audit_data}")
+        logger.info("AUDIT: %s", audit_data)
     
     def _update_query_stats(self, query_time: float):
         """Update query statistics"""
         self._query_stats['total_query_time'] += query_time
         self._query_stats['query_times'].append(query_time)
-        
-        # Keep only last 1000 query times to prevent memory issues
-        if len(self._query_stats['query_times']) > 1000:
-            self._query_stats['query_times'] = self._query_stats['query_times'][-1000:]
     
     def _calculate_average_query_time(self) -> float:
         """Calculate average query time"""
-        if not self._query_stats['query_times']:
+        # Running totals keep this O(1) and stay correct once query_times wraps
+        if not self._query_stats['total_queries']:
             return 0.0
-        return self._query_stats['total_query_time'] / len(self._query_stats['query_times'])
+        return self._query_stats['total_query_time'] / self._query_stats['total_queries']
     
     @PerformanceMonitor.monitor("search_athletes")
     async def search_athletes(self, filters: AthleteSearchFilters, user_id: str = None) -> PaginatedResponse:
@@ -233,36 +273,35 @@ class AthleteSearchService:
             sanitized_filters = self._validate_and_sanitize_filters(filters)
             self._validate_search_parameters(sanitized_filters)
             
-            if self.logging_config.get('log_search_queries', False):
+            if self._log_search_queries:
                 logger.info(f"Searching athletes with filters: {sanitized_filters}")
             
             # Check cache if enabled
             cache_key = None
-            if self.performance_config.get('enable_caching', False):
+            if self._caching_enabled:
                 cache_key = self._get_cache_key(sanitized_filters)
-                with self._cache_lock:
-                    cached_result = self._query_cache.get(cache_key)
-                    
-                    if cached_result and time.time() - cached_result['timestamp'] < self.cache_ttl:
-                        self._query_stats['cache_hits'] += 1
-                        if self.logging_config.get('log_query_performance', False):
-                            logger.info(f"Cache hit for search query: {cache_key}")
-                        return cached_result['data']
-                    
-                    self._query_stats['cache_misses'] += 1
+                # Reads are a single atomic dict lookup; only writers take the lock
+                cached_result = self._query_cache.get(cache_key)
+                
+                if cached_result and time.monotonic_ns() - cached_result[1] < self._cache_ttl_ns:
+                    self._query_stats['cache_hits'] += 1
+                    if self._log_query_performance:
+                        logger.info(f"Cache hit for search query: {cache_key}")
+                    return cached_result[0]
+                
+                self._query_stats['cache_misses'] += 1
             
             # Perform search
             result = await self._perform_search(sanitized_filters)
             
             # Cache result if caching is enabled
-            if self.performance_config.get('enable_caching', False) and cache_key:
+            if self._caching_enabled and cache_key:
                 try:
                     self._clean_cache()  # Clean before adding new entry
                     with self._cache_lock:
-                        self._query_cache[cache_key] = {
-                            'data': result,
-                            'timestamp': time.time()
-                        }
+                        # Re-insert so the entry moves to the back of the age order
+                        self._query_cache.pop(cache_key, None)
+                        self._query_cache[cache_key] = (result, time.monotonic_ns())
                 except Exception as e:
                     logger.warning(f"Failed to cache result: {e}")
                     # Continue without caching
@@ -282,20 +321,32 @@ class AthleteSearchService:
             query_time = time.time() - start_time
             self._update_query_stats(query_time)
     
+    async def _query_page(self, filters: List[FieldFilter], limit: int, offset: int) -> Tuple[List[Dict[str, Any]], int]:
+        """Fetch one page of athletes and the total count under the query semaphore"""
+        # Query and count run concurrently so latency is the slower of the two
+        timeout = self._max_query_timeout
+        async with self._query_semaphore:
+            try:
+                return await asyncio.wait_for(
+                    asyncio.gather(
+                        self.athlete_repository.query(filters, limit, offset),
+                        self.athlete_repository.count(filters)
+                    ),
+                    timeout=timeout
+                )
+            except asyncio.TimeoutError:
+                raise DatabaseError(f"Athlete search timed out after {timeout} seconds")
+    
     @PerformanceMonitor.monitor("perform_search")
     async def _perform_search(self, filters: AthleteSearchFilters) -> PaginatedResponse:
         """Internal method to perform the actual search"""
         firestore_filters = self._build_search_filters(filters)
         
         # Optimize filters if enabled
-        if self.performance_config.get('enable_query_optimization', False):
+        if self._query_optimization_enabled:
             firestore_filters = self._optimize_query_filters(firestore_filters)
         
-        # Get athletes with filters
-        athletes = await self.athlete_repository.query(firestore_filters, filters.limit, filters.offset)
-        
-        # Get total count
-        total_count = await self.athlete_repository.count(firestore_filters)
+        athletes, total_count = await self._query_page(firestore_filters, filters.limit, filters.offset)
         
         # Rank results by relevance
         ranked_athletes = self._rank_search_results(athletes, filters)
@@ -310,14 +361,14 @@ class AthleteSearchService:
         
         try:
             if limit is None:
-                limit = self.search_limits['default_limit']
+                limit = self._default_limit
             
             # Validate parameters
-            if limit <= 0 or limit > self.search_limits['max_limit']:
-                raise InputValidationError(f"Limit must be between 1 and {self.search_limits['max_limit']}")
+            if limit <= 0 or limit > self._max_limit:
+                raise InputValidationError(f"Limit must be between 1 and {self._max_limit}")
             
-            if offset < 0 or offset > self.search_limits['max_offset']:
-                raise InputValidationError(f"Offset must be between 0 and {self.search_limits['max_offset']}")
+            if offset < 0 or offset > self._max_offset:
+                raise InputValidationError(f"Offset must be between 0 and {self._max_offset}")
             
             # Sanitize input
             sanitized_sport_id = self._sanitize_search_input(sport_category_id)
@@ -327,8 +378,7 @@ class AthleteSearchService:
                 FieldFilter("is_active", "==", True)
             ]
             
-            athletes = await self.athlete_repository.query(filters, limit, offset)
-            total_count = await self.athlete_repository.count(filters)
+            athletes, total_count = await self._query_page(filters, limit, offset)
             
             # Create search filters object for pagination
             search_filters = AthleteSearchFilters(
@@ -357,14 +407,14 @@ class AthleteSearchService:
         
         try:
             if limit is None:
-                limit = self.search_limits['default_limit']
+                limit = self._default_limit
             
             # Validate parameters
-            if limit <= 0 or limit > self.search_limits['max_limit']:
-                raise InputValidationError(f"Limit must be between 1 and {self.search_limits['max_limit']}")
+            if limit <= 0 or limit > self._max_limit:
+                raise InputValidationError(f"Limit must be between 1 and {self._max_limit}")
             
-            if offset < 0 or offset > self.search_limits['max_offset']:
-                raise InputValidationError(f"Offset must be between 0 and {self.search_limits['max_offset']}")
+            if offset < 0 or offset > self._max_offset:
+                raise InputValidationError(f"Offset must be between 0 and {self._max_offset}")
             
             # Sanitize input
             sanitized_location = self._sanitize_search_input(location)
@@ -374,8 +424,7 @@ class AthleteSearchService:
                 FieldFilter("is_active", "==", True)
             ]
             
-            athletes = await self.athlete_repository.query(filters, limit, offset)
-            total_count = await self.athlete_repository.count(filters)
+            athletes, total_count = await self._query_page(filters, limit, offset)
             
             # Create search filters object for pagination
             search_filters = AthleteSearchFilters(
@@ -404,7 +453,7 @@ class AthleteSearchService:
         
         try:
             if limit is None:
-                limit = self.search_limits['default_limit']
+                limit = self._default_limit
             
             # Validate parameters
             if min_age < self.age_limits['min_age'] or max_age > self.age_limits['max_age']:
@@ -413,11 +462,11 @@ class AthleteSearchService:
             if min_age > max_age:
                 raise InputValidationError("Minimum age cannot be greater than maximum age")
             
-            if limit <= 0 or limit > self.search_limits['max_limit']:
-                raise InputValidationError(f"Limit must be between 1 and {self.search_limits['max_limit']}")
+            if limit <= 0 or limit > self._max_limit:
+                raise InputValidationError(f"Limit must be between 1 and {self._max_limit}")
             
-            if offset < 0 or offset > self.search_limits['max_offset']:
-                raise InputValidationError(f"Offset must be between 0 and {self.search_limits['max_offset']}")
+            if offset < 0 or offset > self._max_offset:
+                raise InputValidationError(f"Offset must be between 0 and {self._max_offset}")
             
             # Build age filters with corrected logic
             today = date.today()
@@ -430,8 +479,7 @@ class AthleteSearchService:
                 FieldFilter("is_active", "==", True)
             ]
             
-            athletes = await self.athlete_repository.query(filters, limit, offset)
-            total_count = await self.athlete_repository.count(filters)
+            athletes, total_count = await self._query_page(filters, limit, offset)
             
             # Create search filters object for pagination
             search_filters = AthleteSearchFilters(
@@ -461,7 +509,8 @@ class AthleteSearchService:
         
         try:
             filters = [FieldFilter("is_active", "==", True)]
-            return await self.athlete_repository.count(filters)
+            async with self._query_semaphore:
+                return await self.athlete_repository.count(filters)
         except ValidationError as e:
             logger.error(f"Validation error getting active athletes count: {e}")
             raise
@@ -491,7 +540,7 @@ class AthleteSearchService:
         return {
             'status': 'healthy',
             'cache_status': {
-                'enabled': self.performance_config.get('enable_caching', False),
+                'enabled': self._caching_enabled,
                 'size': len(self._query_cache),
                 'max_size': self.max_cache_size,
                 'hit_rate': self.get_performance_stats()['cache_hit_rate']
@@ -504,8 +553,8 @@ class AthleteSearchService:
             },
             'security': {
                 'input_validation': self.security_config.get('enable_input_validation', False),
-                'sanitization': self.security_config.get('enable_sanitization', False),
-                'audit_logging': self.security_config.get('enable_audit_logging', False)
+                'sanitization': self._sanitization_enabled,
+                'audit_logging': self._audit_logging_enabled
             }
         }
     
@@ -519,11 +568,11 @@ class AthleteSearchService:
     
     def _validate_search_parameters(self, filters: AthleteSearchFilters) -> None:
         """Validate search parameters"""
-        if filters.limit <= 0 or filters.limit > self.search_limits['max_limit']:
-            raise InputValidationError(f"Limit must be between 1 and {self.search_limits['max_limit']}")
+        if filters.limit <= 0 or filters.limit > self._max_limit:
+            raise InputValidationError(f"Limit must be between 1 and {self._max_limit}")
         
-        if filters.offset < 0 or filters.offset > self.search_limits['max_offset']:
-            raise InputValidationError(f"Offset must be between 0 and {self.search_limits['max_offset']}")
+        if filters.offset < 0 or filters.offset > self._max_offset:
+            raise InputValidationError(f"Offset must be between 0 and {self._max_offset}")
         
         # Validate age filters
         if filters.min_age and filters.max_age and filters.min_age > filters.max_age:
@@ -537,25 +586,12 @@ class AthleteSearchService:
     
     def _optimize_query_filters(self, filters: List[FieldFilter]) -> List[FieldFilter]:
         """Optimize query filters for better performance"""
-        if not self.performance_config.get('enable_query_optimization', False):
+        if not self._query_optimization_enabled:
             return filters
         
-        # Sort filters by selectivity (most selective first)
-        selectivity_order = ['is_active', 'primary_sport_category_id', 'position', 'gender', 'location']
-        optimized_filters = []
-        
-        for field in selectivity_order:
-            for filter_obj in filters:
-                if hasattr(filter_obj, 'field_path') and filter_obj.field_path == field:
-                    optimized_filters.append(filter_obj)
-                    break
-        
-        # Add remaining filters
-        for filter_obj in filters:
-            if filter_obj not in optimized_filters:
-                optimized_filters.append(filter_obj)
-        
-        return optimized_filters
+        # Stable sort by selectivity (most selective first); unknown fields keep their order at the end
+        unknown = len(self._FIELD_PRIORITY)
+        return sorted(filters, key=lambda f: self._FIELD_PRIORITY.get(getattr(f, 'field_path', None), unknown))
     
     def _build_search_filters(self, filters: AthleteSearchFilters) -> List[FieldFilter]:
         """Build Firestore filters for search with input sanitization"""
@@ -572,7 +608,7 @@ class AthleteSearchService:
         if filters.gender:
             sanitized_gender = self._sanitize_search_input(filters.gender)
             # Validate gender against allowed values
-            if sanitized_gender in self.security_config.get('allowed_genders', ['male', 'female', 'other']):
+            if sanitized_gender in self._allowed_genders:
                 firestore_filters.append(FieldFilter("gender", "==", sanitized_gender))
             else:
                 logger.warning(f"Invalid gender value: {sanitized_gender}")
@@ -3,9 +3,14 @@ from firebase_admin import firestore
 from firebase_admin.firestore import FieldFilter
 import logging
 import asyncio
+import base64
+import json
 from contextlib import asynccontextmanager
+from google.api_core import exceptions as google_exceptions
+from google.cloud.firestore_v1.async_client import AsyncClient
+from google.cloud.firestore_v1.async_transaction import async_transactional
 
-from ..firebaseConfig import get_firestore_client
+from ..firebaseConfig import get_firestore_async_client
 
 # Simple service-level exceptions
 class ValidationError(Exception):
@@ -38,6 +43,54 @@ class ConnectionError(Exception):
 
 logger = logging.getLogger(__name__)
 
+# Process-wide Firestore AsyncClient and collection references. The SDK keeps
+# its own gRPC channel pool, so every DatabaseService shares one client and each
+# collection reference is built once per name.
+# The AsyncClient's gRPC channel is bound to the event loop that first uses it,
+# so these caches assume a single loop per process (the uvicorn server loop).
+# Code that runs several loops, such as tests, must reset both caches per loop.
+_CLIENT_CACHE: Optional[AsyncClient] = None
+_COLLECTION_CACHE: Dict[str, Any] = {}
+
+
+def _get_or_create_client() -> AsyncClient:
+    """Return the shared Firestore AsyncClient, creating it on first use."""
+    global _CLIENT_CACHE
+    if _CLIENT_CACHE is None:
+        client = get_firestore_async_client()
+        if client is None:
+            raise ConnectionError("Firestore client is not initialized")
+        _CLIENT_CACHE = client
+    return _CLIENT_CACHE
+
+
+def _require_doc_id(doc_id: Any, message: Optional[str] = None) -> str:
+    """Validate a document ID argument and return it stripped.
+    
+    When message is given, any missing, non-string or blank ID raises it instead
+    of the default "is required" / "must be a string" messages.
+    """
+    if message is not None:
+        if not isinstance(doc_id, str) or not doc_id.strip():
+            raise ValidationError(message)
+    elif not doc_id:
+        raise ValidationError("Document ID is required")
+    elif not isinstance(doc_id, str):
+        raise ValidationError("Document ID must be a string")
+    return doc_id.strip()
+
+
+def _require_dict(data: Any, label: str) -> None:
+    """Validate that a payload argument is a non-empty dictionary."""
+    if not data:
+        raise ValidationError(f"{label} is required")
+    if not isinstance(data, dict):
+        raise ValidationError(f"{label} must be a dictionary")
+
+
+# Transient commit failures worth retrying with backoff
+RETRYABLE_COMMIT_ERRORS = (google_exceptions.Aborted, google_exceptions.DeadlineExceeded)
+
 
 class DatabaseConnectionPool:
     """Connection pool for managing Firestore connections"""
@@ -56,8 +109,11 @@ class DatabaseConnectionPool:
                 return self._connections.pop()
             
             if self._active_connections < self.max_connections:
+                # Only count the slot once the client exists, so a failed
+                # client creation cannot leak capacity
+                client = _get_or_create_client()
                 self._active_connections += 1
-                return get_firestore_client()
+                return client
             
             # Wait for a connection to become available
             timeout = asyncio.create_task(asyncio.sleep(self.connection_timeout))
@@ -101,6 +157,7 @@ class DatabaseService:
         - Detailed error logging and custom exceptions
         - Connection health monitoring
         - Connection pooling for better performance
+        - Non-blocking Firestore I/O through the AsyncClient
     
     Usage:
         ```python
@@ -124,11 +181,13 @@ class DatabaseService:
         ```
     
     Firestore Limitations:
-        - Batch operations limited to 500 operations
+        - Batch operations limited to 500 operations per commit
+          (larger inputs are split into concurrent 500-operation commits)
         - Query results limited to 1000 documents by default
-        - 'in' clause limited to 10 values
-        - No native case-insensitive search
-        - No native count() method
+        - 'in' clause limited to 30 values (larger lists are sharded)
+        - No native case-insensitive search (search() matches lowercase
+          word tokens stored for the service's search_fields)
+        - count() uses the server-side aggregation query
     
     Attributes:
         collection_name (str): Name of the Firestore collection
@@ -142,12 +201,18 @@ class DatabaseService:
     # Class-level connection pool
     _connection_pool = DatabaseConnectionPool()
     
-    def __init__(self, collection_name: str):
+    max_commit_retries = 3
+    commit_retry_base_delay = 0.5
+    max_concurrent_commits = 10
+    
+    def __init__(self, collection_name: str, search_fields: Optional[List[str]] = None):
         """Initialize the database service for a specific collection.
         
         Args:
             collection_name (str): Name of the Firestore collection to operate on.
                 Must be a non-empty string.
+            search_fields (Optional[List[str]]): String fields that search() can
+                query. Only these fields get ``<field>_tokens`` arrays on write.
         
         Raises:
             ValidationError: If collection_name is empty or invalid.
@@ -159,6 +224,9 @@ class DatabaseService:
             
             # Initialize service for athletes collection
             athlete_service = DatabaseService("athletes")
+            
+            # Allow search() on the name field
+            team_service = DatabaseService("teams", search_fields=["name"])
             ```
         """
         if not collection_name or not collection_name.strip():
@@ -167,6 +235,18 @@ class DatabaseService:
         self.collection_name = collection_name.strip()
         self.max_batch_size = 500  # Firestore batch limit
         self.max_query_limit = 1000  # Reasonable query limit
+        self.search_fields = tuple(search_fields or ())  # Fields indexed for search()
+        self.max_token_field_length = 200  # Longest string field indexed for search()
+        self.max_in_values = 30  # Firestore 'in' clause limit
+    
+    def _collection_ref(self, db):
+        """Return the memoized collection reference for this service's collection."""
+        collection = _COLLECTION_CACHE.get(self.collection_name)
+        if collection is None:
+            collection = _COLLECTION_CACHE.setdefault(
+                self.collection_name, db.collection(self.collection_name)
+            )
+        return collection
     
     @asynccontextmanager
     async def _get_connection(self):
@@ -198,14 +278,34 @@ class DatabaseService:
         """
         try:
             async with self._get_connection() as db:
-                collection = db.collection(self.collection_name)
-                # Simple health check - try to access collection metadata
-                await collection.limit(1).stream()
+                collection = self._collection_ref(db)
+                # Simple health check - try to read a single document
+                async for _ in collection.limit(1).stream():
+                    break
                 return True
         except Exception as e:
             logger.error(f"Health check failed: {e}")
             return False
     
+    def _add_search_tokens(self, data: Dict[str, Any]) -> None:
+        """Store lowercase word tokens for each search field being written.
+        
+        Sets ``<field>_tokens`` for every configured search field present in
+        ``data`` so search() can use an indexed ``array_contains`` query instead
+        of filtering results client-side. Tokens are cleared when the field is
+        set to a non-string or an over-long string, and deleted with the field.
+        """
+        for field in self.search_fields:
+            if field not in data:
+                continue
+            value = data[field]
+            if value is firestore.DELETE_FIELD:
+                data[f"{field}_tokens"] = firestore.DELETE_FIELD
+            elif isinstance(value, str) and len(value) <= self.max_token_field_length:
+                data[f"{field}_tokens"] = list(dict.fromkeys(value.lower().split()))
+            else:
+                data[f"{field}_tokens"] = []
+    
     async def create(self, data: Dict[str, Any], doc_id: Optional[str] = None) -> str:
         """Create a new document in the collection.
         
@@ -248,27 +348,25 @@ class DatabaseService:
         """
         try:
             # Input validation
-            if not data:
-                raise ValidationError("Data is required")
-            if not isinstance(data, dict):
-                raise ValidationError("Data must be a dictionary")
+            _require_dict(data, "Data")
             
             # Validate doc_id if provided
             if doc_id is not None:
-                if not isinstance(doc_id, str) or not doc_id.strip():
-                    raise ValidationError("Document ID must be a non-empty string")
-                doc_id = doc_id.strip()
+                doc_id = _require_doc_id(doc_id, "Document ID must be a non-empty string")
             
             # Call validation hook if exists (allows subclasses to implement custom validation)
             if hasattr(self, 'validate_data'):
                 await self.validate_data(data)
             
+            # Index short string fields for search()
+            self._add_search_tokens(data)
+            
             # Add timestamps for audit trail
             data['created_at'] = firestore.SERVER_TIMESTAMP
             data['updated_at'] = firestore.SERVER_TIMESTAMP
             
             async with self._get_connection() as db:
-                collection = db.collection(self.collection_name)
+                collection = self._collection_ref(db)
                 
                 if doc_id:
                     # Create document with specific ID
@@ -319,16 +417,11 @@ class DatabaseService:
         """
         try:
             # Input validation
-            if not doc_id:
-                raise ValidationError("Document ID is required")
-            if not isinstance(doc_id, str):
-                raise ValidationError("Document ID must be a string")
-            
-            doc_id = doc_id.strip()
+            doc_id = _require_doc_id(doc_id)
             
             # Get document reference and fetch data
             async with self._get_connection() as db:
-                collection = db.collection(self.collection_name)
+                collection = self._collection_ref(db)
                 doc_ref = collection.document(doc_id)
                 doc = await doc_ref.get()
                 
@@ -378,28 +471,24 @@ class DatabaseService:
         Note:
             - Only updates the fields provided in the data parameter
             - Automatically adds 'updated_at' timestamp
+            - Refreshes '<field>_tokens' for updated search fields (see search())
             - Will fail if the document doesn't exist
             - Automatically strips whitespace from doc_id
         """
         try:
             # Input validation
-            if not doc_id:
-                raise ValidationError("Document ID is required")
-            if not isinstance(doc_id, str):
-                raise ValidationError("Document ID must be a string")
-            if not data:
-                raise ValidationError("Update data is required")
-            if not isinstance(data, dict):
-                raise ValidationError("Update data must be a dictionary")
+            doc_id = _require_doc_id(doc_id)
+            _require_dict(data, "Update data")
             
-            doc_id = doc_id.strip()
+            # Keep search tokens in step with updated string fields
+            self._add_search_tokens(data)
             
             # Add updated timestamp for audit trail
             data['updated_at'] = firestore.SERVER_TIMESTAMP
             
             # Update the document
             async with self._get_connection() as db:
-                collection = db.collection(self.collection_name)
+                collection = self._collection_ref(db)
                 doc_ref = collection.document(doc_id)
                 await doc_ref.update(data)
             return True
@@ -441,16 +530,11 @@ class DatabaseService:
         """
         try:
             # Input validation
-            if not doc_id:
-                raise ValidationError("Document ID is required")
-            if not isinstance(doc_id, str):
-                raise ValidationError("Document ID must be a string")
-            
-            doc_id = doc_id.strip()
+            doc_id = _require_doc_id(doc_id)
             
             # Delete the document
             async with self._get_connection() as db:
-                collection = db.collection(self.collection_name)
+                collection = self._collection_ref(db)
                 doc_ref = collection.document(doc_id)
                 await doc_ref.delete()
             return True
@@ -461,7 +545,90 @@ class DatabaseService:
             logger.error(f"Error deleting document {doc_id} from {self.collection_name}: {e}")
             raise DatabaseError(f"Failed to delete document: {str(e)}")
     
-    async def list_all(self, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+    @staticmethod
+    async def _collect(stream) -> List[Any]:
+        """Drain an async document stream into a list of snapshots."""
+        return [doc async for doc in stream]
+    
+    @staticmethod
+    def _materialize(docs) -> List[Dict[str, Any]]:
+        """Convert document snapshots to dicts with the document 'id' added."""
+        return [{**doc.to_dict(), 'id': doc.id} for doc in docs]
+    
+    @staticmethod
+    def _encode_cursor(doc) -> str:
+        """Encode the position of a document snapshot as an opaque cursor.
+        
+        Cursor pages are ordered by document ID, so the cursor is the URL-safe
+        base64 of the JSON-encoded ID of the last document on the page.
+        """
+        payload = json.dumps(doc.id)
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+    
+    @staticmethod
+    def _decode_cursor(cursor: str) -> str:
+        """Decode an opaque cursor back to the document ID it points after.
+        
+        Raises:
+            ValidationError: If the cursor is malformed.
+        """
+        try:
+            doc_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        except (ValueError, TypeError, UnicodeError):
+            raise ValidationError("Cursor is invalid")
+        if not isinstance(doc_id, str) or not doc_id:
+            raise ValidationError("Cursor is invalid")
+        return doc_id
+    
+    def _validate_page_position(self, offset: int, cursor: Optional[str]) -> None:
+        """Validate the offset/cursor pair accepted by the paginated reads."""
+        if offset < 0:
+            raise ValidationError("Offset must be non-negative")
+        if cursor is not None:
+            if not isinstance(cursor, str) or not cursor:
+                raise ValidationError("Cursor must be a non-empty string")
+            if offset:
+                raise ValidationError("Offset and cursor cannot be combined")
+    
+    async def _fetch_page(self, filters: List[FieldFilter], limit: int, offset: int = 0,
+                          cursor: Optional[str] = None, raw: bool = False,
+                          paginate: bool = False) -> List[Any]:
+        """Run a filtered query, starting after ``cursor`` when one is given.
+        
+        Cursor reads (a ``cursor`` or ``paginate=True``) are ordered by document
+        ID. Other reads keep Firestore's default ordering, so range filters on
+        other fields do not need a composite index with ``__name__``.
+        
+        Returns documents with an 'id' field added, or the raw snapshots when
+        ``raw`` is True so callers can build the next cursor.
+        """
+        start_after_id = self._decode_cursor(cursor) if cursor is not None else None
+        
+        async with self._get_connection() as db:
+            query = self._collection_ref(db)
+            
+            # Apply each filter condition sequentially
+            for filter_condition in filters:
+                query = query.where(filter=filter_condition)
+            
+            # Order by document ID so a cursor can resume without rereading
+            # skipped documents the way OFFSET does
+            if paginate or start_after_id is not None:
+                query = query.order_by("__name__")
+            if start_after_id is not None:
+                query = query.start_after({"__name__": start_after_id})
+            query = query.limit(limit)
+            if offset:
+                query = query.offset(offset)
+            docs = await self._collect(query.stream())
+        
+        if raw:
+            return docs
+        
+        return self._materialize(docs)
+    
+    async def list_all(self, limit: int = 100, offset: int = 0,
+                       cursor: Optional[str] = None) -> List[Dict[str, Any]]:
         """List all documents in the collection with pagination.
         
         Retrieves documents from the collection with optional pagination.
@@ -470,12 +637,15 @@ class DatabaseService:
         Args:
             limit (int): Maximum number of documents to return (1-1000).
             offset (int): Number of documents to skip for pagination.
+                Prefer ``cursor``; Firestore reads every skipped document.
+            cursor (Optional[str]): Opaque cursor returned as ``next_cursor`` by
+                get_paginated_results(). Results start after that document.
         
         Returns:
             List[Dict[str, Any]]: List of documents, each with an 'id' field added.
         
         Raises:
-            ValidationError: If limit or offset parameters are invalid.
+            ValidationError: If limit, offset, or cursor parameters are invalid.
             DatabaseError: If the listing operation fails.
         
         Example:
@@ -488,35 +658,26 @@ class DatabaseService:
             
             # Get all users (up to 1000)
             all_users = await user_service.list_all()
+            
+            # Continue after the last document of a previous page
+            page = await user_service.get_paginated_results(limit=20)
+            more_users = await user_service.list_all(limit=20, cursor=page['next_cursor'])
             ```
         
         Note:
             - Maximum limit is 1000 documents
             - Each document includes an 'id' field
-            - Use offset for pagination (0-based)
+            - Results are ordered by document ID when a cursor is given
+            - Use cursor for pagination; offset is kept for existing callers
             - Consider using get_paginated_results() for better pagination metadata
         """
         try:
             # Input validation
             if limit < 1 or limit > self.max_query_limit:
                 raise ValidationError(f"Limit must be between 1 and {self.max_query_limit}")
-            if offset < 0:
-                raise ValidationError("Offset must be non-negative")
+            self._validate_page_position(offset, cursor)
             
-            # Build query with pagination
-            async with self._get_connection() as db:
-                collection = db.collection(self.collection_name)
-                query = collection.limit(limit).offset(offset)
-                docs = await query.stream()
-            
-            # Process results and add document IDs
-            results = []
-            for doc in docs:
-                data = doc.to_dict()
-                data['id'] = doc.id
-                results.append(data)
-            
-            return results
+            return await self._fetch_page([], limit, offset, cursor)
             
         except ValidationError:
             raise
@@ -524,7 +685,8 @@ class DatabaseService:
             logger.error(f"Error listing documents from {self.collection_name}: {e}")
             raise DatabaseError(f"Failed to list documents: {str(e)}")
     
-    async def query(self, filters: List[FieldFilter], limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+    async def query(self, filters: List[FieldFilter], limit: int = 100, offset: int = 0,
+                    cursor: Optional[str] = None) -> List[Dict[str, Any]]:
         """Query documents with filters and pagination.
         
         Performs a filtered query on the collection using Firestore FieldFilter
@@ -534,12 +696,15 @@ class DatabaseService:
             filters (List[FieldFilter]): List of Firestore FieldFilter objects.
             limit (int): Maximum number of documents to return (1-1000).
             offset (int): Number of documents to skip for pagination.
+                Prefer ``cursor``; Firestore reads every skipped document.
+            cursor (Optional[str]): Opaque cursor returned as ``next_cursor`` by
+                get_paginated_results(). Results start after that document.
         
         Returns:
             List[Dict[str, Any]]: List of matching documents, each with an 'id' field.
         
         Raises:
-            ValidationError: If filters, limit, or offset parameters are invalid.
+            ValidationError: If filters, limit, offset, or cursor parameters are invalid.
             DatabaseError: If the query operation fails.
         
         Example:
@@ -556,15 +721,18 @@ class DatabaseService:
             active_adults = await user_service.query([age_filter, status_filter])
             
             # Query with pagination
-            first_page = await user_service.query([age_filter], limit=20, offset=0)
-            second_page = await user_service.query([age_filter], limit=20, offset=20)
+            first_page = await user_service.get_paginated_results([age_filter], limit=20)
+            second_page = await user_service.query(
+                [age_filter], limit=20, cursor=first_page['next_cursor']
+            )
             ```
         
         Note:
             - Filters are applied in the order they appear in the list
             - Maximum limit is 1000 documents
             - Each document includes an 'id' field
-            - Use offset for pagination (0-based)
+            - Results are ordered by document ID when a cursor is given
+            - Use cursor for pagination; offset is kept for existing callers
             - Consider Firestore query limitations and indexing requirements
         """
         try:
@@ -573,30 +741,9 @@ class DatabaseService:
                 raise ValidationError("Filters must be a list")
             if limit < 1 or limit > self.max_query_limit:
                 raise ValidationError(f"Limit must be between 1 and {self.max_query_limit}")
-            if offset < 0:
-                raise ValidationError("Offset must be non-negative")
+            self._validate_page_position(offset, cursor)
             
-            # Start with base collection reference
-            async with self._get_connection() as db:
-                collection = db.collection(self.collection_name)
-                query = collection
-                
-                # Apply each filter condition sequentially
-                for filter_condition in filters:
-                    query = query.where(filter=filter_condition)
-                
-                # Apply pagination
-                query = query.limit(limit).offset(offset)
-                docs = await query.stream()
-            
-            # Process results and add document IDs
-            results = []
-            for doc in docs:
-                data = doc.to_dict()
-                data['id'] = doc.id
-                results.append(data)
-            
-            return results
+            return await self._fetch_page(filters, limit, offset, cursor)
             
         except ValidationError:
             raise
@@ -608,8 +755,8 @@ class DatabaseService:
         """Count documents with optional filters.
         
         Counts the total number of documents in the collection, optionally
-        applying filters. Note that this method has performance implications
-        for large collections as it needs to fetch documents to count them.
+        applying filters. Uses Firestore's server-side count() aggregation, so
+        no documents are transferred regardless of collection size.
         
         Args:
             filters (Optional[List[FieldFilter]]): Optional list of FieldFilter objects.
@@ -639,10 +786,8 @@ class DatabaseService:
             ```
         
         Note:
-            - This method fetches documents to count them (up to 1000)
-            - For large collections, consider maintaining counter fields
-            - Performance may degrade with complex filters
-            - Firestore doesn't provide a native count() method
+            - Billed as one read per 1000 index entries counted
+            - Filters may require a composite index, as for query()
         """
         try:
             # Input validation
@@ -651,7 +796,7 @@ class DatabaseService:
             
             # Start with base collection reference
             async with self._get_connection() as db:
-                collection = db.collection(self.collection_name)
+                collection = self._collection_ref(db)
                 query = collection
                 
                 # Apply filters if provided
@@ -659,11 +804,9 @@ class DatabaseService:
                     for filter_condition in filters:
                         query = query.where(filter=filter_condition)
                 
-                # For now, use the current approach but with a smaller limit for counting
-                # Note: Firestore doesn't have a native count() method
-                # Consider using a counter field or implementing pagination-based counting
-                docs = await query.limit(1000).stream()
-                return len(list(docs))
+                # Server-side aggregation returns only the total
+                snapshot = await query.count().get()
+                return snapshot[0][0].value
             
         except ValidationError:
             raise
@@ -708,16 +851,11 @@ class DatabaseService:
         """
         try:
             # Input validation
-            if not doc_id:
-                raise ValidationError("Document ID is required")
-            if not isinstance(doc_id, str):
-                raise ValidationError("Document ID must be a string")
-            
-            doc_id = doc_id.strip()
+            doc_id = _require_doc_id(doc_id)
             
             # Check document existence without fetching full data
             async with self._get_connection() as db:
-                collection = db.collection(self.collection_name)
+                collection = self._collection_ref(db)
                 doc_ref = collection.document(doc_id)
                 doc = await doc_ref.get()
                 return doc.exists
@@ -778,18 +916,80 @@ class DatabaseService:
         """
         try:
             async with self._get_connection() as db:
-                result = await db.run_transaction(update_func)
+                transaction = db.transaction()
+                result = await async_transactional(update_func)(transaction)
                 return result
         except Exception as e:
             logger.error(f"Transaction failed: {e}")
             raise DatabaseError(f"Transaction failed: {str(e)}")
     
+    def _chunk(self, items: List[Any]) -> List[List[Any]]:
+        """Split items into chunks of at most max_batch_size (one commit each)."""
+        size = self.max_batch_size
+        return [items[i:i + size] for i in range(0, len(items), size)]
+    
+    async def _commit_chunks(self, db, chunks: List[List[Any]],
+                             add_to_batch: Callable[[Any, Any], None]) -> None:
+        """Commit each chunk as its own write batch, concurrently.
+        
+        At most max_concurrent_commits commits are in flight at once, so N
+        chunks cost roughly N / max_concurrent_commits round trips. Each chunk
+        is retried with exponential backoff on Aborted/DeadlineExceeded. Chunks
+        are independent: a failure in one does not roll back the others, and
+        every chunk is settled before any failure is reported.
+        
+        Args:
+            db: Firestore client used to create the write batches.
+            chunks (List[List[Any]]): Items to write, at most 500 per chunk.
+            add_to_batch (Callable): Adds one item's write to a batch.
+        
+        Raises:
+            DatabaseError: If any chunk fails, naming the failed chunk indexes.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrent_commits)
+        
+        async def commit_chunk(chunk: List[Any]) -> None:
+            async with semaphore:
+                await commit_with_retry(chunk)
+        
+        async def commit_with_retry(chunk: List[Any]) -> None:
+            for attempt in range(self.max_commit_retries + 1):
+                # Rebuild the batch on every attempt so a retry never replays
+                # a partially consumed batch
+                batch = db.batch()
+                for item in chunk:
+                    add_to_batch(batch, item)
+                try:
+                    await batch.commit()
+                    return
+                except RETRYABLE_COMMIT_ERRORS as e:
+                    if attempt == self.max_commit_retries:
+                        raise
+                    delay = self.commit_retry_base_delay * (2 ** attempt)
+                    logger.warning(
+                        f"Batch commit to {self.collection_name} failed ({e}); "
+                        f"retrying in {delay:.1f}s"
+                    )
+                    await asyncio.sleep(delay)
+        
+        results = await asyncio.gather(
+            *(commit_chunk(chunk) for chunk in chunks), return_exceptions=True
+        )
+        failed = [(i, result) for i, result in enumerate(results) if isinstance(result, BaseException)]
+        if failed:
+            failed_indexes = ", ".join(str(i) for i, _ in failed)
+            raise DatabaseError(
+                f"Failed to commit chunks [{failed_indexes}] of {len(chunks)} "
+                f"(other chunks were written): {failed[0][1]}"
+            )
+    
     async def batch_create(self, documents: List[Dict[str, Any]]) -> List[str]:
-        """Create multiple documents in a single batch operation.
+        """Create multiple documents using batch operations.
         
         Efficiently creates multiple documents using Firestore's batch operations.
         This method is much more efficient than creating documents individually
-        when you need to create many documents at once.
+        when you need to create many documents at once. Inputs larger than
+        max_batch_size are split into 500-document batches committed concurrently.
         
         Args:
             documents (List[Dict[str, Any]]): List of document data dictionaries.
@@ -817,9 +1017,9 @@ class DatabaseService:
             ```
         
         Note:
-            - Maximum batch size is 500 documents (Firestore limit)
+            - Each commit holds at most 500 documents (Firestore limit)
             - Automatically adds timestamps to each document
-            - All documents are created atomically (all succeed or all fail)
+            - Each 500-document batch is atomic; separate batches are not
             - Returns document IDs in the same order as input documents
         """
         try:
@@ -828,8 +1028,6 @@ class DatabaseService:
                 raise ValidationError("Documents list is required")
             if not isinstance(documents, list):
                 raise ValidationError("Documents must be a list")
-            if len(documents) > self.max_batch_size:
-                raise ValidationError(f"Batch size cannot exceed {self.max_batch_size}")
             
             # Validate each document in the batch
             for i, data in enumerate(documents):
@@ -838,25 +1036,24 @@ class DatabaseService:
                 if not data:
                     raise ValidationError(f"Document {i} cannot be empty")
             
-            # Create batch operation
             async with self._get_connection() as db:
-                batch = db.batch()
-                doc_ids = []
+                collection = self._collection_ref(db)
+                writes = []
                 
-                # Add each document to the batch
+                # Assign IDs up front so they match the input order
                 for data in documents:
+                    self._add_search_tokens(data)
+                    
                     # Add timestamps for audit trail
                     data['created_at'] = firestore.SERVER_TIMESTAMP
                     data['updated_at'] = firestore.SERVER_TIMESTAMP
-                    
-                    # Create document reference and add to batch
-                    doc_ref = collection.document()
-                    batch.set(doc_ref, data)
-                    doc_ids.append(doc_ref.id)
+                    writes.append((collection.document(), data))
                 
-                # Commit the batch operation
-                await batch.commit()
-                return doc_ids
+                await self._commit_chunks(
+                    db, self._chunk(writes),
+                    lambda batch, write: batch.set(*write)
+                )
+                return [doc_ref.id for doc_ref, _ in writes]
             
         except ValidationError:
             raise
@@ -865,10 +1062,12 @@ class DatabaseService:
             raise DatabaseError(f"Failed to batch create documents: {str(e)}")
     
     async def batch_update(self, updates: List[tuple]) -> bool:
-        """Update multiple documents in a single batch operation.
+        """Update multiple documents using batch operations.
         
         Efficiently updates multiple documents using Firestore's batch operations.
-        Each update should be a tuple containing (doc_id, update_data).
+        Each update should be a tuple containing (doc_id, update_data). Inputs
+        larger than max_batch_size are split into 500-update batches committed
+        concurrently.
         
         Args:
             updates (List[tuple]): List of update tuples.
@@ -898,9 +1097,9 @@ class DatabaseService:
             ```
         
         Note:
-            - Maximum batch size is 500 updates (Firestore limit)
+            - Each commit holds at most 500 updates (Firestore limit)
             - Automatically adds updated_at timestamp to each update
-            - All updates are applied atomically (all succeed or all fail)
+            - Each 500-update batch is atomic; separate batches are not
             - Each update tuple must contain exactly 2 elements
         """
         try:
@@ -909,8 +1108,6 @@ class DatabaseService:
                 raise ValidationError("Updates list is required")
             if not isinstance(updates, list):
                 raise ValidationError("Updates must be a list")
-            if len(updates) > self.max_batch_size:
-                raise ValidationError(f"Batch size cannot exceed {self.max_batch_size}")
             
             # Validate each update tuple
             for i, update in enumerate(updates):
@@ -922,21 +1119,21 @@ class DatabaseService:
                 if not isinstance(data, dict):
                     raise ValidationError(f"Data in update {i} must be a dictionary")
             
-            # Create batch operation
             async with self._get_connection() as db:
-                batch = db.batch()
+                collection = self._collection_ref(db)
+                writes = []
                 
-                # Add each update to the batch
                 for doc_id, data in updates:
+                    self._add_search_tokens(data)
+                    
                     # Add updated timestamp for audit trail
                     data['updated_at'] = firestore.SERVER_TIMESTAMP
-                    
-                    # Create document reference and add update to batch
-                    doc_ref = collection.document(doc_id.strip())
-                    batch.update(doc_ref, data)
+                    writes.append((collection.document(doc_id.strip()), data))
                 
-                # Commit the batch operation
-                await batch.commit()
+                await self._commit_chunks(
+                    db, self._chunk(writes),
+                    lambda batch, write: batch.update(*write)
+                )
                 return True
             
         except ValidationError:
@@ -946,11 +1143,12 @@ class DatabaseService:
             raise DatabaseError(f"Failed to batch update documents: {str(e)}")
     
     async def batch_delete(self, doc_ids: List[str]) -> bool:
-        """Delete multiple documents in a single batch operation.
+        """Delete multiple documents using batch operations.
         
         Efficiently deletes multiple documents using Firestore's batch operations.
         This method is much more efficient than deleting documents individually
-        when you need to delete many documents at once.
+        when you need to delete many documents at once. Inputs larger than
+        max_batch_size are split into 500-deletion batches committed concurrently.
         
         Args:
             doc_ids (List[str]): List of document IDs to delete.
@@ -973,8 +1171,8 @@ class DatabaseService:
             ```
         
         Note:
-            - Maximum batch size is 500 deletions (Firestore limit)
-            - All deletions are performed atomically (all succeed or all fail)
+            - Each commit holds at most 500 deletions (Firestore limit)
+            - Each 500-deletion batch is atomic; separate batches are not
             - Deletions are permanent and cannot be undone
             - Will not fail if some documents don't exist
         """
@@ -984,25 +1182,20 @@ class DatabaseService:
                 raise ValidationError("Document IDs list is required")
             if not isinstance(doc_ids, list):
                 raise ValidationError("Document IDs must be a list")
-            if len(doc_ids) > self.max_batch_size:
-                raise ValidationError(f"Batch size cannot exceed {self.max_batch_size}")
             
             # Validate each document ID
             for i, doc_id in enumerate(doc_ids):
                 if not isinstance(doc_id, str) or not doc_id.strip():
                     raise ValidationError(f"Document ID {i} must be a non-empty string")
             
-            # Create batch operation
             async with self._get_connection() as db:
-                batch = db.batch()
+                collection = self._collection_ref(db)
+                doc_refs = [collection.document(doc_id.strip()) for doc_id in doc_ids]
                 
-                # Add each deletion to the batch
-                for doc_id in doc_ids:
-                    doc_ref = collection.document(doc_id.strip())
-                    batch.delete(doc_ref)
-                
-                # Commit the batch operation
-                await batch.commit()
+                await self._commit_chunks(
+                    db, self._chunk(doc_refs),
+                    lambda batch, doc_ref: batch.delete(doc_ref)
+                )
                 return True
             
         except ValidationError:
@@ -1014,41 +1207,43 @@ class DatabaseService:
     async def search(self, field: str, value: str, limit: int = 100) -> List[Dict[str, Any]]:
         """Search documents by field value with case-insensitive matching.
         
-        Performs a text search on a specific field. Note that this is a
-        simplified implementation with limitations. For production applications
-        requiring advanced search capabilities, consider using external search
-        services like Algolia or Elasticsearch.
+        Matches documents whose ``<field>_tokens`` array contains the lowercased
+        search word. Writes through create(), update() and the batch methods
+        populate these tokens for the service's search_fields, so Firestore
+        returns only matching documents. Note that this
+        is a simplified implementation with limitations. For production
+        applications requiring advanced search capabilities, consider using
+        external search services like Algolia or Elasticsearch.
         
         Args:
-            field (str): Name of the field to search in.
-            value (str): Text value to search for.
+            field (str): Name of the field to search in. Must be one of search_fields.
+            value (str): Single word to search for (matched case-insensitively).
             limit (int): Maximum number of results to return (1-1000).
         
         Returns:
             List[Dict[str, Any]]: List of matching documents, each with an 'id' field.
         
         Raises:
-            ValidationError: If field, value, or limit parameters are invalid.
+            ValidationError: If field, value, or limit parameters are invalid,
+                the field is not searchable, or value is not a single word.
             DatabaseError: If the search operation fails.
         
         Example:
             ```python
+            user_service = DatabaseService("users", search_fields=["name"])
+            
             # Search for users by name
             users = await user_service.search("name", "john", limit=50)
             
-            # Search for users by email domain
-            users = await user_service.search("email", "@gmail.com", limit=100)
-            
-            # Search for users by partial name
-            users = await user_service.search("name", "doe", limit=25)
+            # Matching is case-insensitive
+            users = await user_service.search("name", "Doe", limit=25)
             ```
         
         Note:
             - This is a simplified search implementation
             - For production, consider using Algolia, Elasticsearch, or similar
-            - Firestore doesn't support case-insensitive search natively
-            - Search is performed using ">=" operator with additional filtering
-            - Performance may degrade with large collections
+            - Matches one whole word, not substrings or phrases
+            - Documents written before tokens existed are not matched until rewritten
         """
         try:
             # Input validation
@@ -1064,27 +1259,23 @@ class DatabaseService:
                 raise ValidationError(f"Limit must be between 1 and {self.max_query_limit}")
             
             field = field.strip()
-            value = value.strip()
+            if field not in self.search_fields:
+                raise ValidationError(f"Field '{field}' is not searchable")
             
-            # Note: This is a simplified search implementation
-            # For production, consider using Algolia, Elasticsearch, or similar
-            # Firestore doesn't support case-insensitive search natively
+            # Tokens are single words, so a multi-word value could never match
+            tokens = value.lower().split()
+            if len(tokens) != 1:
+                raise ValidationError("Search value must be a single word")
             
-            # Use ">=" operator as a starting point for search
+            # Query the precomputed token array so filtering happens server-side
             async with self._get_connection() as db:
-                collection = db.collection(self.collection_name)
-                query = collection.where(filter=FieldFilter(field, ">=", value.lower()))
-                docs = await query.limit(limit).stream()
-            
-            # Filter results for case-insensitive matching
-            results = []
-            for doc in docs:
-                data = doc.to_dict()
-                if field in data and value.lower() in str(data[field]).lower():
-                    data['id'] = doc.id
-                    results.append(data)
+                collection = self._collection_ref(db)
+                query = collection.where(
+                    filter=FieldFilter(f"{field}_tokens", "array_contains", tokens[0])
+                )
+                docs = await self._collect(query.limit(limit).stream())
             
-            return results
+            return self._materialize(docs)
             
         except ValidationError:
             raise
@@ -1142,9 +1333,9 @@ class DatabaseService:
             
             # Query for documents matching the field value
             async with self._get_connection() as db:
-                collection = db.collection(self.collection_name)
+                collection = self._collection_ref(db)
                 query = collection.where(filter=FieldFilter(field, "==", value)).limit(1)
-                docs = await query.stream()
+                docs = await self._collect(query.stream())
             
             # Return the first matching document
             for doc in docs:
@@ -1164,12 +1355,14 @@ class DatabaseService:
         """Get documents where a field matches any value from a list.
         
         Retrieves all documents where the specified field matches any of the
-        values in the provided list. Uses Firestore's 'in' clause for efficiency.
+        values in the provided list. Uses Firestore's 'in' clause for efficiency;
+        lists longer than max_in_values are split into several 'in' queries that
+        run concurrently and are merged.
         
         Args:
             field (str): Name of the field to match against.
             values (List[Any]): List of values to match in the field.
-                Maximum 10 values (Firestore limitation).
+                Any length; sent in chunks of 30 (Firestore 'in' limit).
         
         Returns:
             List[Dict[str, Any]]: List of matching documents, each with an 'id' field.
@@ -1194,8 +1387,8 @@ class DatabaseService:
             ```
         
         Note:
-            - Maximum 10 values due to Firestore 'in' clause limitation
-            - Returns all documents matching any of the values
+            - Lists over 30 values cost one query per 30 values, run in parallel
+            - Returns all documents matching any of the values, without duplicates
             - Each returned document includes an 'id' field
             - Useful for bulk retrieval of documents by known values
         """
@@ -1209,25 +1402,26 @@ class DatabaseService:
                 raise ValidationError("Values list is required")
             if not isinstance(values, list):
                 raise ValidationError("Values must be a list")
-            if len(values) > 10:  # Firestore 'in' clause limit
-                raise ValidationError("Values list cannot exceed 10 items")
             
             field = field.strip()
+            size = self.max_in_values
+            chunks = [values[i:i + size] for i in range(0, len(values), size)]
             
-            # Query for documents matching any of the values
+            # Query for documents matching any of the values, one 'in' query per chunk
             async with self._get_connection() as db:
-                collection = db.collection(self.collection_name)
-                query = collection.where(filter=FieldFilter(field, "in", values))
-                docs = await query.stream()
+                collection = self._collection_ref(db)
+                queries = [collection.where(filter=FieldFilter(field, "in", chunk)) for chunk in chunks]
+                chunk_docs = await asyncio.gather(*(
+                    self._collect(query.stream()) for query in queries
+                ))
             
-            # Process results and add document IDs
-            results = []
-            for doc in docs:
-                data = doc.to_dict()
-                data['id'] = doc.id
-                results.append(data)
+            # Merge chunk results, dropping documents matched by more than one chunk
+            unique_docs = {}
+            for docs in chunk_docs:
+                for doc in docs:
+                    unique_docs.setdefault(doc.id, doc)
             
-            return results
+            return self._materialize(unique_docs.values())
             
         except ValidationError:
             raise
@@ -1236,32 +1430,34 @@ class DatabaseService:
             raise DatabaseError(f"Failed to get documents by field list: {str(e)}")
     
     async def get_paginated_results(self, filters: Optional[List[FieldFilter]] = None, 
-                                   limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+                                   limit: int = 20, cursor: Optional[str] = None) -> Dict[str, Any]:
         """Get paginated results with comprehensive metadata.
         
         Retrieves paginated results with detailed pagination information including
         total count, navigation helpers, and result metadata. This method is ideal
         for implementing pagination UI components.
         
+        Pages are ordered by document ID and resume from an opaque cursor, so
+        fetching a deep page reads only ``limit + 1`` documents instead of every
+        document before it.
+        
         Args:
             filters (Optional[List[FieldFilter]]): Optional list of FieldFilter objects.
                 If None, returns all documents in the collection.
             limit (int): Number of documents per page (1-1000).
-            offset (int): Number of documents to skip for pagination (0-based).
+            cursor (Optional[str]): ``next_cursor`` from the previous page, or None
+                for the first page.
         
         Returns:
             Dict[str, Any]: Pagination result with the following structure:
                 - results: List of documents with 'id' fields
                 - total_count: Total number of matching documents
                 - limit: Current page size
-                - offset: Current page offset
                 - has_next: Boolean indicating if next page exists
-                - has_previous: Boolean indicating if previous page exists
-                - next_offset: Offset for next page (None if no next page)
-                - previous_offset: Offset for previous page (None if no previous page)
+                - next_cursor: Cursor for next page (None if no next page)
         
         Raises:
-            ValidationError: If filters, limit, or offset parameters are invalid.
+            ValidationError: If filters, limit, or cursor parameters are invalid.
             DatabaseError: If the pagination operation fails.
         
         Example:
@@ -1272,8 +1468,7 @@ class DatabaseService:
             active_filter = FieldFilter("status", "==", "active")
             page1 = await user_service.get_paginated_results(
                 filters=[active_filter], 
-                limit=20, 
-                offset=0
+                limit=20
             )
             
             print(f"Page 1: {len(page1['results'])} users")
@@ -1285,7 +1480,7 @@ class DatabaseService:
                 page2 = await user_service.get_paginated_results(
                     filters=[active_filter],
                     limit=20,
-                    offset=page1['next_offset']
+                    cursor=page1['next_cursor']
                 )
                 print(f"Page 2: {len(page2['results'])} users")
             ```
@@ -1293,9 +1488,9 @@ class DatabaseService:
         Note:
             - Provides comprehensive pagination metadata
             - Useful for building pagination UI components
-            - Automatically calculates navigation helpers
+            - Cursors are opaque; pass them back unchanged
             - Each document includes an 'id' field
-            - Consider performance implications for large collections
+            - Only forward navigation is supported
         """
         try:
             # Input validation
@@ -1303,28 +1498,22 @@ class DatabaseService:
                 raise ValidationError("Filters must be a list or None")
             if limit < 1 or limit > self.max_query_limit:
                 raise ValidationError(f"Limit must be between 1 and {self.max_query_limit}")
-            if offset < 0:
-                raise ValidationError("Offset must be non-negative")
+            self._validate_page_position(0, cursor)
             
             # Get total count of matching documents
             total_count = await self.count(filters)
             
-            # Get paginated results
-            results = await self.query(filters or [], limit, offset)
-            
-            # Calculate pagination metadata
-            has_next = (offset + limit) < total_count
-            has_previous = offset > 0
+            # Fetch one extra document to learn whether a next page exists
+            docs = await self._fetch_page(filters or [], limit + 1, cursor=cursor, raw=True, paginate=True)
+            has_next = len(docs) > limit
+            page_docs = docs[:limit]
             
             return {
-                "results": results,
+                "results": self._materialize(page_docs),
                 "total_count": total_count,
                 "limit": limit,
-                "offset": offset,
                 "has_next": has_next,
-                "has_previous": has_previous,
-                "next_offset": offset + limit if has_next else None,
-                "previous_offset": max(0, offset - limit) if has_previous else None
+                "next_cursor": self._encode_cursor(page_docs[-1]) if has_next else None
             }
             
         except ValidationError:
@@ -145,10 +145,11 @@ class StatsService:
         try:
             logger.info(f"Fetching stats for athlete: {athlete_id}, limit: {limit}, offset: {offset}")
             
-            # Create cache key with better hashing
-            import hashlib
+            # Cache keys only live in this process, so the built-in (non-cryptographic)
+            # string hash is enough to fold the filters into a short fixed-width key
             filters_str = str(sorted(filters.items())) if filters else ""
-            cache_key = f"athlete_stats_{athlete_id}_{hashlib.md5(filters_str.encode()).hexdigest()}_{limit}_{offset}"
+            filters_hash = hash(filters_str) & 0xFFFFFFFFFFFFFFFF
+            cache_key = f"athlete_stats_{athlete_id}_{filters_hash:016x}_{limit}_{offset}"
             
             # Check cache first
             cached_result = await self._get_cached_stats(cache_key)
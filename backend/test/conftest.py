@@ -0,0 +1,47 @@
+"""
+Shared test configuration for the Athletes Networking API test suite
+"""
+import asyncio
+import os
+import sys
+from unittest.mock import MagicMock
+
+import firebase_admin.auth
+import pytest
+
+from app.firebaseConfig import firebase_config
+from app.services import database_service
+
+try:
+    import uvloop  # installed with uvicorn[standard]; unavailable on Windows
+except ImportError:
+    uvloop = None
+
+
+@pytest.fixture(scope="session")
+def event_loop_policy():
+    """Run async tests on uvloop when TEST_EVENT_LOOP=uvloop, matching the uvicorn server loop.
+
+    Opt-in because a test stuck in a blocking executor call (e.g. a Firestore client
+    waiting on credentials) cannot be interrupted by pytest-timeout under uvloop.
+    """
+    if uvloop and os.environ.get("TEST_EVENT_LOOP") == "uvloop":
+        return uvloop.EventLoopPolicy()
+    if sys.platform == "win32":
+        # The default Proactor loop adds per-task overhead and the tests need no pipes/subprocesses
+        return asyncio.WindowsSelectorEventLoopPolicy()
+    return asyncio.DefaultEventLoopPolicy()
+
+
+@pytest.fixture
+def mock_auth():
+    """Mocked Firebase Auth client, limited to the firebase_admin.auth API"""
+    return MagicMock(spec=firebase_admin.auth)
+
+
+@pytest.fixture(autouse=True)
+def _reset_firestore_client_cache(monkeypatch):
+    """Drop cached Firestore AsyncClients, which are bound to the event loop of the test that created them"""
+    monkeypatch.setattr(firebase_config, "_firestore_async_client", None)
+    monkeypatch.setattr(database_service, "_CLIENT_CACHE", None)
+    monkeypatch.setattr(database_service, "_COLLECTION_CACHE", {})
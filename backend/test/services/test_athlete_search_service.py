@@ -2,11 +2,14 @@
 Test file for improved AthleteSearchService with caching, sanitization, and performance features
 """
 import pytest
+import asyncio
+import copy
 from unittest.mock import Mock, AsyncMock, patch, MagicMock
 from datetime import date, datetime
 from dateutil.relativedelta import relativedelta
 import time
 import threading
+from types import SimpleNamespace
 
 from app.services.athlete_search_service import AthleteSearchService
 from app.models.athlete import AthleteSearchFilters
@@ -15,12 +18,21 @@ from app.services.database_service import ValidationError, DatabaseError
 from app.utils.performance_monitor import PerformanceMonitor
 
 
+class _DBStub:
+    """Slotted stand-in for DatabaseService exposing only the calls the search service makes"""
+    __slots__ = ('query', 'count')
+    
+    def __init__(self, query=None, count=None):
+        self.query = query or AsyncMock(return_value=[])
+        self.count = count or AsyncMock(return_value=0)
+
+
 class TestImprovedAthleteSearchService:
     """Test cases for improved AthleteSearchService"""
     
-    @pytest.fixture
-    def mock_config(self):
-        """Mock configuration for testing with all required keys"""
+    @pytest.fixture(scope="session")
+    def _base_config(self):
+        """Configuration with all required keys, built once per session"""
         return {
             'collections': {
                 'athlete_profiles': 'athlete_profiles'
@@ -63,13 +75,30 @@ class TestImprovedAthleteSearchService:
             }
         }
     
+    @pytest.fixture
+    def mock_config(self, _base_config, request):
+        """Mock configuration for testing; a deep copy with optional per-section overrides
+        
+        Override sections with ``@pytest.mark.parametrize('mock_config', [{...}], indirect=True)``.
+        """
+        config = copy.deepcopy(_base_config)
+        for section, overrides in getattr(request, 'param', {}).items():
+            config[section].update(overrides)
+        return config
+    
+    @pytest.fixture
+    def service(self, mock_config):
+        """AthleteSearchService built against mock_config with stubbed database dependencies"""
+        with patch.multiple('app.services.athlete_search_service',
+                            get_athlete_config=Mock(return_value=mock_config),
+                            DatabaseService=Mock(return_value=_DBStub()),
+                            DatabaseConnectionPool=Mock(return_value=SimpleNamespace())):
+            yield AthleteSearchService()
+    
     @pytest.fixture
     def mock_database_service(self):
         """Mock database service"""
-        mock_service = Mock()
-        mock_service.query = AsyncMock(return_value=[])
-        mock_service.count = AsyncMock(return_value=0)
-        return mock_service
+        return _DBStub()
     
     @patch('app.services.athlete_search_service.get_athlete_config')
     @patch('app.services.athlete_search_service.DatabaseService')
@@ -77,8 +106,8 @@ class TestImprovedAthleteSearchService:
     def test_init_with_complete_config(self, mock_connection_pool, mock_db_service, mock_get_config, mock_config):
         """Test service initialization with complete configuration"""
         mock_get_config.return_value = mock_config
-        mock_db_service.return_value = Mock()
-        mock_connection_pool.return_value = Mock()
+        mock_db_service.return_value = _DBStub()
+        mock_connection_pool.return_value = SimpleNamespace()
         
         service = AthleteSearchService()
         
@@ -118,8 +147,8 @@ class TestImprovedAthleteSearchService:
         }
         
         mock_get_config.return_value = partial_config
-        mock_db_service.return_value = Mock()
-        mock_connection_pool.return_value = Mock()
+        mock_db_service.return_value = _DBStub()
+        mock_connection_pool.return_value = SimpleNamespace()
         
         service = AthleteSearchService()
         
@@ -129,240 +158,160 @@ class TestImprovedAthleteSearchService:
         assert service.config['performance']['enable_caching'] == True
         assert service.config['security']['enable_sanitization'] == True
     
-    def test_sanitize_search_input_normal_string(self, mock_config):
-        """Test input sanitization with normal string"""
-        with patch('app.services.athlete_search_service.get_athlete_config', return_value=mock_config):
-            with patch('app.services.athlete_search_service.DatabaseService'):
-                with patch('app.services.athlete_search_service.DatabaseConnectionPool'):
-                    service = AthleteSearchService()
-                    
-                    result = service._sanitize_search_input("normal text")
-                    assert result == "normal text"
-    
-    def test_sanitize_search_input_with_dangerous_chars(self, mock_config):
-        """Test input sanitization with dangerous characters"""
-        with patch('app.services.athlete_search_service.get_athlete_config', return_value=mock_config):
-            with patch('app.services.athlete_search_service.DatabaseService'):
-                with patch('app.services.athlete_search_service.DatabaseConnectionPool'):
-                    service = AthleteSearchService()
-                    
-                    result = service._sanitize_search_input("<script>alert('xss')</script>")
-                    assert result == "scriptalertxss"
-                    assert "<" not in result
-                    assert ">" not in result
-                    assert "'" not in result
-    
-    def test_sanitize_search_input_with_blocked_patterns(self, mock_config):
-        """Test input sanitization with blocked patterns"""
-        with patch('app.services.athlete_search_service.get_athlete_config', return_value=mock_config):
-            with patch('app.services.athlete_search_service.DatabaseService'):
-                with patch('app.services.athlete_search_service.DatabaseConnectionPool'):
-                    service = AthleteSearchService()
-                    
-                    result = service._sanitize_search_input("javascript:alert('xss')")
-                    assert "javascript" not in result
-                    assert "alert" in result  # Only blocked patterns should be removed
+    @pytest.mark.parametrize("raw, check", [
+        ("normal text", lambda r: r == "normal text"),
+        ("<script>alert('xss')</script>",
+         lambda r: r == "scriptalertxss" and "<" not in r and ">" not in r and "'" not in r),
+        # Only blocked patterns should be removed
+        ("javascript:alert('xss')", lambda r: "javascript" not in r and "alert" in r),
+        # Truncated to max_string_length from config
+        ("a" * 1500, lambda r: r == "a" * 1000),
+    ], ids=["normal_string", "dangerous_chars", "blocked_patterns", "long_string"])
+    def test_sanitize_search_input(self, service, raw, check):
+        """Test input sanitization of normal, dangerous, blocked and overlong input"""
+        assert check(service._sanitize_search_input(raw))
     
-    def test_sanitize_search_input_with_long_string(self, mock_config):
-        """Test input sanitization with string exceeding max length"""
-        with patch('app.services.athlete_search_service.get_athlete_config', return_value=mock_config):
-            with patch('app.services.athlete_search_service.DatabaseService'):
-                with patch('app.services.athlete_search_service.DatabaseConnectionPool'):
-                    service = AthleteSearchService()
-                    
-                    long_string = "a" * 1500
-                    result = service._sanitize_search_input(long_string)
-                    assert len(result) == 1000  # max_string_length from config
-                    assert result == "a" * 1000
+    @pytest.mark.parametrize('mock_config', [{'security': {'enable_sanitization': False}}], indirect=True, ids=['sanitization_disabled'])
+    def test_sanitize_search_input_disabled(self, service):
+        """Test sanitization only truncates when disabled"""
+        assert service._sanitize_search_input("<b>script</b>") == "<b>script</b>"
+        assert service._sanitize_search_input("a" * 1500) == "a" * 1000
     
-    def test_validate_and_sanitize_filters(self, mock_config):
+    def test_validate_and_sanitize_filters(self, service):
         """Test filter validation and sanitization"""
-        with patch('app.services.athlete_search_service.get_athlete_config', return_value=mock_config):
-            with patch('app.services.athlete_search_service.DatabaseService'):
-                with patch('app.services.athlete_search_service.DatabaseConnectionPool'):
-                    service = AthleteSearchService()
-                    
-                    filters = AthleteSearchFilters(
-                        sport_category_id="<script>football</script>",
-                        position="forward<script>",
-                        gender="male",
-                        location="NYC<script>alert('xss')</script>"
-                    )
-                    
-                    sanitized = service._validate_and_sanitize_filters(filters)
-                    
-                    # Verify dangerous characters are removed
-                    assert "<" not in sanitized.sport_category_id
-                    assert "<" not in sanitized.position
-                    assert "<" not in sanitized.location
-                    assert sanitized.gender == "male"  # Valid gender
+        filters = AthleteSearchFilters(
+            sport_category_id="<script>football</script>",
+            position="forward<script>",
+            gender="male",
+            location="NYC<script>alert('xss')</script>"
+        )
+        
+        sanitized = service._validate_and_sanitize_filters(filters)
+        
+        # Verify dangerous characters are removed
+        assert "<" not in sanitized.sport_category_id
+        assert "<" not in sanitized.position
+        assert "<" not in sanitized.location
+        assert sanitized.gender == "male"  # Valid gender
     
-    def test_validate_and_sanitize_filters_invalid_gender(self, mock_config):
+    def test_validate_and_sanitize_filters_invalid_gender(self, service):
         """Test filter validation with invalid gender"""
-        with patch('app.services.athlete_search_service.get_athlete_config', return_value=mock_config):
-            with patch('app.services.athlete_search_service.DatabaseService'):
-                with patch('app.services.athlete_search_service.DatabaseConnectionPool'):
-                    service = AthleteSearchService()
-                    
-                    filters = AthleteSearchFilters(gender="invalid_gender")
-                    
-                    with pytest.raises(InputValidationError, match="Invalid gender value"):
-                        service._validate_and_sanitize_filters(filters)
+        filters = AthleteSearchFilters(gender="invalid_gender")
+        
+        with pytest.raises(InputValidationError, match="Invalid gender value"):
+            service._validate_and_sanitize_filters(filters)
     
-    def test_get_cache_key_consistency(self, mock_config):
+    def test_get_cache_key_consistency(self, service):
         """Test cache key generation consistency"""
-        with patch('app.services.athlete_search_service.get_athlete_config', return_value=mock_config):
-            with patch('app.services.athlete_search_service.DatabaseService'):
-                with patch('app.services.athlete_search_service.DatabaseConnectionPool'):
-                    service = AthleteSearchService()
-                    
-                    filters1 = AthleteSearchFilters(limit=20, offset=0, sport_category_id="football")
-                    filters2 = AthleteSearchFilters(limit=20, offset=0, sport_category_id="football")
-                    
-                    key1 = service._get_cache_key(filters1)
-                    key2 = service._get_cache_key(filters2)
-                    
-                    assert key1 == key2
+        filters1 = AthleteSearchFilters(limit=20, offset=0, sport_category_id="football")
+        filters2 = AthleteSearchFilters(limit=20, offset=0, sport_category_id="football")
+        
+        key1 = service._get_cache_key(filters1)
+        key2 = service._get_cache_key(filters2)
+        
+        assert key1 == key2
     
-    def test_clean_cache_thread_safety(self, mock_config):
+    def test_clean_cache_thread_safety(self, service):
         """Test cache cleaning with thread safety"""
-        with patch('app.services.athlete_search_service.get_athlete_config', return_value=mock_config):
-            with patch('app.services.athlete_search_service.DatabaseService'):
-                with patch('app.services.athlete_search_service.DatabaseConnectionPool'):
-                    service = AthleteSearchService()
-                    
-                    # Add some cache entries
-                    service._query_cache['key1'] = {'data': 'test1', 'timestamp': time.time()}
-                    service._query_cache['key2'] = {'data': 'test2', 'timestamp': time.time()}
-                    
-                    # Test that clean_cache can be called without errors
-                    service._clean_cache()
-                    
-                    # Verify cache is accessible
-                    assert len(service._query_cache) >= 0
+        # Add some cache entries, oldest first
+        service._query_cache['expired'] = ('old', time.monotonic_ns() - service._cache_ttl_ns - 1)
+        service._query_cache['key1'] = ('test1', time.monotonic_ns())
+        service._query_cache['key2'] = ('test2', time.monotonic_ns())
+        
+        service._clean_cache()
+        
+        # Only the expired entry at the front is evicted
+        assert list(service._query_cache) == ['key1', 'key2']
     
-    def test_audit_logging(self, mock_config):
+    def test_audit_logging(self, service):
         """Test audit logging functionality"""
-        with patch('app.services.athlete_search_service.get_athlete_config', return_value=mock_config):
-            with patch('app.services.athlete_search_service.DatabaseService'):
-                with patch('app.services.athlete_search_service.DatabaseConnectionPool'):
-                    with patch('app.services.athlete_search_service.logger') as mock_logger:
-                        service = AthleteSearchService()
-                        
-                        service._log_audit_event("test_event", "user123", {"detail": "test"})
-                        
-                        # Verify audit log was called
-                        mock_logger.info.assert_called_once()
-                        call_args = mock_logger.info.call_args[0][0]
-                        assert "AUDIT:" in call_args
-                        assert "test_event" in call_args
-                        assert "user123" in call_args
+        with patch('app.services.athlete_search_service.logger') as mock_logger:
+            service._log_audit_event("test_event", "user123", {"detail": "test"})
+            
+            # Verify audit log was called
+            mock_logger.info.assert_called_once()
+            message, *args = mock_logger.info.call_args[0]
+            call_args = message % tuple(args)
+            assert "AUDIT:" in call_args
+            assert "test_event" in call_args
+            assert "user123" in call_args
     
-    def test_audit_logging_disabled(self, mock_config):
+    @pytest.mark.parametrize('mock_config', [{'security': {'enable_audit_logging': False}}], indirect=True, ids=['audit_logging_disabled'])
+    def test_audit_logging_disabled(self, service):
         """Test audit logging when disabled"""
-        mock_config['security']['enable_audit_logging'] = False
-        
-        with patch('app.services.athlete_search_service.get_athlete_config', return_value=mock_config):
-            with patch('app.services.athlete_search_service.DatabaseService'):
-                with patch('app.services.athlete_search_service.DatabaseConnectionPool'):
-                    with patch('app.services.athlete_search_service.logger') as mock_logger:
-                        service = AthleteSearchService()
-                        
-                        service._log_audit_event("test_event", "user123", {"detail": "test"})
-                        
-                        # Verify no logging occurred
-                        mock_logger.info.assert_not_called()
+        with patch('app.services.athlete_search_service.logger') as mock_logger:
+            service._log_audit_event("test_event", "user123", {"detail": "test"})
+            
+            # Verify no logging occurred
+            mock_logger.info.assert_not_called()
     
-    def test_query_optimization(self, mock_config):
+    def test_audit_logging_skipped_below_info(self, service):
+        """Test audit record is not built when the logger filters out INFO"""
+        with patch('app.services.athlete_search_service.logger') as mock_logger:
+            mock_logger.isEnabledFor.return_value = False
+            
+            service._log_audit_event("test_event", "user123", {"detail": "test"})
+            
+            mock_logger.info.assert_not_called()
+    
+    def test_query_optimization(self, service):
         """Test query filter optimization"""
-        with patch('app.services.athlete_search_service.get_athlete_config', return_value=mock_config):
-            with patch('app.services.athlete_search_service.DatabaseService'):
-                with patch('app.services.athlete_search_service.DatabaseConnectionPool'):
-                    service = AthleteSearchService()
-                    
-                    # Create mock filters
-                    mock_filters = [
-                        Mock(field_path="location"),
-                        Mock(field_path="is_active"),
-                        Mock(field_path="position")
-                    ]
-                    
-                    optimized = service._optimize_query_filters(mock_filters)
-                    
-                    # Should reorder filters by selectivity
-                    assert len(optimized) == 3
+        # Create mock filters
+        mock_filters = [
+            SimpleNamespace(field_path="location"),
+            SimpleNamespace(field_path="is_active"),
+            SimpleNamespace(field_path="position")
+        ]
+        
+        optimized = service._optimize_query_filters(mock_filters)
+        
+        # Should reorder filters by selectivity
+        assert [f.field_path for f in optimized] == ["is_active", "position", "location"]
     
-    def test_query_optimization_disabled(self, mock_config):
+    @pytest.mark.parametrize('mock_config', [{'performance': {'enable_query_optimization': False}}], indirect=True, ids=['optimization_disabled'])
+    def test_query_optimization_disabled(self, service):
         """Test query optimization when disabled"""
-        mock_config['performance']['enable_query_optimization'] = False
+        mock_filters = [SimpleNamespace(field_path="location")]
+        optimized = service._optimize_query_filters(mock_filters)
         
-        with patch('app.services.athlete_search_service.get_athlete_config', return_value=mock_config):
-            with patch('app.services.athlete_search_service.DatabaseService'):
-                with patch('app.services.athlete_search_service.DatabaseConnectionPool'):
-                    service = AthleteSearchService()
-                    
-                    mock_filters = [Mock(field_path="location")]
-                    optimized = service._optimize_query_filters(mock_filters)
-                    
-                    # Should return original filters unchanged
-                    assert optimized == mock_filters
+        # Should return original filters unchanged
+        assert optimized == mock_filters
     
-    def test_get_health_status(self, mock_config):
+    def test_get_health_status(self, service):
         """Test health status method"""
-        with patch('app.services.athlete_search_service.get_athlete_config', return_value=mock_config):
-            with patch('app.services.athlete_search_service.DatabaseService'):
-                with patch('app.services.athlete_search_service.DatabaseConnectionPool'):
-                    service = AthleteSearchService()
-                    
-                    health = service.get_health_status()
-                    
-                    assert health['status'] == 'healthy'
-                    assert 'cache_status' in health
-                    assert 'database_status' in health
-                    assert 'performance' in health
-                    assert 'security' in health
-                    assert health['cache_status']['enabled'] == True
-                    assert health['security']['sanitization'] == True
+        health = service.get_health_status()
+        
+        assert health['status'] == 'healthy'
+        assert 'cache_status' in health
+        assert 'database_status' in health
+        assert 'performance' in health
+        assert 'security' in health
+        assert health['cache_status']['enabled'] == True
+        assert health['security']['sanitization'] == True
     
-    def test_get_performance_stats_with_monitor(self, mock_config):
+    def test_get_performance_stats_with_monitor(self, service):
         """Test performance statistics including monitor metrics"""
-        with patch('app.services.athlete_search_service.get_athlete_config', return_value=mock_config):
-            with patch('app.services.athlete_search_service.DatabaseService'):
-                with patch('app.services.athlete_search_service.DatabaseConnectionPool'):
-                    service = AthleteSearchService()
-                    
-                    # Simulate some activity
-                    service._query_stats['total_queries'] = 10
-                    service._query_stats['cache_hits'] = 6
-                    service._query_stats['cache_misses'] = 4
-                    service._query_stats['total_query_time'] = 5.0
-                    service._query_stats['query_times'] = [0.5] * 10
-                    
-                    stats = service.get_performance_stats()
-                    
-                    assert stats['total_queries'] == 10
-                    assert stats['cache_hits'] == 6
-                    assert stats['cache_misses'] == 4
-                    assert stats['cache_hit_rate'] == 60.0
-                    assert stats['total_query_time'] == 5.0
-                    assert stats['avg_query_time'] == 0.5
-                    assert 'performance_monitor_metrics' in stats
+        # Simulate some activity
+        service._query_stats['total_queries'] = 10
+        service._query_stats['cache_hits'] = 6
+        service._query_stats['cache_misses'] = 4
+        service._query_stats['total_query_time'] = 5.0
+        service._query_stats['query_times'] = [0.5] * 10
+        
+        stats = service.get_performance_stats()
+        
+        assert stats['total_queries'] == 10
+        assert stats['cache_hits'] == 6
+        assert stats['cache_misses'] == 4
+        assert stats['cache_hit_rate'] == 60.0
+        assert stats['total_query_time'] == 5.0
+        assert stats['avg_query_time'] == 0.5
+        assert 'performance_monitor_metrics' in stats
     
-    @patch('app.services.athlete_search_service.get_athlete_config')
-    @patch('app.services.athlete_search_service.DatabaseService')
-    @patch('app.services.athlete_search_service.DatabaseConnectionPool')
     @pytest.mark.asyncio
-    async def test_search_athletes_with_performance_monitor(self, mock_connection_pool, mock_db_service, mock_get_config, mock_config):
+    async def test_search_athletes_with_performance_monitor(self, service):
         """Test search athletes with PerformanceMonitor integration"""
-        mock_get_config.return_value = mock_config
-        
-        mock_db = Mock()
-        mock_db.query = AsyncMock(return_value=[{'id': '1', 'name': 'John'}])
-        mock_db.count = AsyncMock(return_value=1)
-        mock_db_service.return_value = mock_db
-        mock_connection_pool.return_value = Mock()
-        
-        service = AthleteSearchService()
+        service.athlete_repository = _DBStub(query=AsyncMock(return_value=[{'id': '1', 'name': 'John'}]), count=AsyncMock(return_value=1))
         filters = AthleteSearchFilters(limit=20, offset=0)
         
         # Test search with performance monitoring
@@ -375,20 +324,25 @@ class TestImprovedAthleteSearchService:
         monitor_metrics = service.performance_monitor.get_metrics()
         assert 'search_athletes' in monitor_metrics
     
-    @patch('app.services.athlete_search_service.get_athlete_config')
-    @patch('app.services.athlete_search_service.DatabaseService')
-    @patch('app.services.athlete_search_service.DatabaseConnectionPool')
-    def test_clear_cache_thread_safe(self, mock_connection_pool, mock_db_service, mock_get_config, mock_config):
-        """Test cache clearing with thread safety"""
-        mock_get_config.return_value = mock_config
-        mock_db_service.return_value = Mock()
-        mock_connection_pool.return_value = Mock()
+    @pytest.mark.parametrize('mock_config', [{'performance': {'max_query_timeout': 0.01}}], indirect=True, ids=['short_timeout'])
+    @pytest.mark.asyncio
+    async def test_perform_search_timeout(self, service):
+        """Test search query and count are bounded by max_query_timeout"""
+        async def slow_query(*args):
+            await asyncio.sleep(1)
         
-        service = AthleteSearchService()
+        service.athlete_repository = _DBStub(query=AsyncMock(side_effect=slow_query), count=AsyncMock(return_value=1))
+        filters = AthleteSearchFilters(limit=20, offset=0)
         
+        # Call the undecorated method so only the search itself is exercised
+        with pytest.raises(DatabaseError, match="timed out"):
+            await AthleteSearchService._perform_search.__wrapped__(service, filters)
+    
+    def test_clear_cache_thread_safe(self, service):
+        """Test cache clearing with thread safety"""
         # Add some cache entries
-        service._query_cache['key1'] = {'data': 'test1', 'timestamp': time.time()}
-        service._query_cache['key2'] = {'data': 'test2', 'timestamp': time.time()}
+        service._query_cache['key1'] = ('test1', time.monotonic_ns())
+        service._query_cache['key2'] = ('test2', time.monotonic_ns())
         
         assert len(service._query_cache) == 2
         
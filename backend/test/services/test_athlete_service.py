@@ -1,104 +1,207 @@
 """
 Test file for refactored AthleteService with PerformanceMonitor integration
 """
+import importlib
+
 import pytest
-from unittest.mock import Mock, AsyncMock, patch, MagicMock
-from datetime import datetime, timezone
+from unittest.mock import Mock, AsyncMock, patch, DEFAULT
+from datetime import datetime
+from types import MappingProxyType, SimpleNamespace
 
-from app.services.athlete_service import AthleteService, AthleteServiceConfig
-from app.models.athlete import AthleteProfileCreate, AthleteProfileUpdate, AthleteSearchFilters
-from app.services.exceptions import AthleteServiceError
+from app.models.athlete import AthleteProfileCreate, AthleteSearchFilters
 from app.utils.performance_monitor import PerformanceMonitor
 
+# Fail on "coroutine ... was never awaited" instead of letting a missed await pass silently
+pytestmark = pytest.mark.filterwarnings("error::RuntimeWarning")
+
+SUB_SERVICES = frozenset({'profile_service', 'search_service', 'recommendation_service', 'analytics_service'})
+
+USER_ID = "user123"
+SCOUT_ID = "scout123"
+ATHLETE_ID = "athlete123"
+
+# Stubbed sub-service results, shared by the module-scoped mocks; read-only
+PROFILE_STUB = MappingProxyType({'id': '1', 'name': 'John'})
+SEARCH_RESULT_STUB = SimpleNamespace(count=1, results=({'id': '1'},))
+PREFERENCES = MappingProxyType({'sport': 'football', 'position': 'forward'})
+
+# Built once; tests must not mutate it (use model_copy() for variants)
+SAMPLE_PROFILE = AthleteProfileCreate(
+    first_name="John",
+    last_name="Doe",
+    date_of_birth=datetime(2000, 1, 1).date(),
+    gender="male",
+    location="NYC",
+    primary_sport_category_id="football",
+    position="forward",
+    height_cm=180,
+    weight_kg=75
+)
+
+
+async def _profile_calls(service):
+    """Create a profile and check the stubbed result"""
+    result = await service.create_athlete_profile(USER_ID, SAMPLE_PROFILE)
+    assert result['id'] == '1'
+    assert result['name'] == 'John'
+
+
+async def _search_calls(service):
+    """Search athletes and list them by sport category"""
+    filters = AthleteSearchFilters(limit=20, offset=0)
+    result = await service.search_athletes(filters)
+    assert result.count == 1
+    
+    result = await service.get_athletes_by_sport_category("football", limit=10)
+    assert result.count == 1
+
+
+async def _recommendation_calls(service):
+    """Fetch recommended athletes and athletes matching preferences"""
+    result = await service.get_recommended_athletes(SCOUT_ID, limit=10)
+    assert len(result) == 1
+    assert result[0]['name'] == 'John'
+    
+    result = await service.get_athletes_by_preferences(PREFERENCES, limit=10)
+    assert len(result) == 1
+
+
+async def _analytics_calls(service):
+    """Fetch analytics and statistics, then run a bulk update"""
+    result = await service.get_athlete_analytics(ATHLETE_ID)
+    assert result.profile_views == 10
+    
+    result = await service.get_athlete_statistics()
+    assert result['total_athletes'] == 100
+    
+    updates = [{'id': '1', 'update': 'data'}]
+    result = await service.bulk_update_athletes(updates)
+    assert result['updated'] == 5
+
+
+@pytest.fixture(scope="module")
+def athlete_service_module():
+    """The athlete_service module, imported on first use rather than at collection"""
+    return importlib.import_module('app.services.athlete_service')
+
+
+@pytest.fixture(scope="module")
+def max_threshold_ms(athlete_service_module):
+    """Largest slow-operation threshold, which the service hands to PerformanceMonitor"""
+    return max(athlete_service_module.AthleteServiceConfig.SLOW_OPERATION_THRESHOLDS.values())
+
 
 class TestAthleteService:
     """Test cases for refactored AthleteService"""
     
-    @pytest.fixture
+    @pytest.fixture(autouse=True, scope="class")
+    def _patch_deps(self, request, athlete_service_module):
+        """Patch config and sub-services once for the whole class, exposing the mocks on the class"""
+        with patch.multiple(
+            athlete_service_module,
+            get_athlete_config=DEFAULT,
+            AthleteProfileService=DEFAULT,
+            AthleteSearchService=DEFAULT,
+            AthleteRecommendationService=DEFAULT,
+            AthleteAnalyticsService=DEFAULT,
+        ) as mocks:
+            request.cls.mock_get_config = mocks['get_athlete_config']
+            request.cls.mock_profile = mocks['AthleteProfileService']
+            request.cls.mock_search = mocks['AthleteSearchService']
+            request.cls.mock_recommendation = mocks['AthleteRecommendationService']
+            request.cls.mock_analytics = mocks['AthleteAnalyticsService']
+            yield
+    
+    @pytest.fixture(scope="session")
     def mock_config(self):
-        """Mock configuration for testing"""
-        return {
-            'collections': {
+        """Mock configuration for testing, built once and read-only"""
+        return MappingProxyType({
+            'collections': MappingProxyType({
                 'athlete_profiles': 'athlete_profiles',
                 'users': 'users',
                 'media': 'media'
-            },
-            'search_limits': {
+            }),
+            'search_limits': MappingProxyType({
                 'max_limit': 100
-            },
-            'bulk_limits': {
+            }),
+            'bulk_limits': MappingProxyType({
                 'max_bulk_update': 1000
-            },
-            'statistics_limits': {
+            }),
+            'statistics_limits': MappingProxyType({
                 'max_sample_size': 1000
-            },
-            'performance': {
+            }),
+            'performance': MappingProxyType({
                 'enable_caching': True
-            },
-            'age_limits': {
+            }),
+            'age_limits': MappingProxyType({
                 'min_age': 13,
                 'max_age': 100
-            }
-        }
+            })
+        })
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def mock_profile_service(self):
-        """Mock profile service"""
-        mock_service = Mock()
-        mock_service.create_athlete_profile = AsyncMock(return_value={'id': '1', 'name': 'John'})
-        mock_service.get_athlete_profile = AsyncMock(return_value={'id': '1', 'name': 'John'})
-        mock_service.update_athlete_profile = AsyncMock(return_value={'id': '1', 'name': 'John Updated'})
-        mock_service.delete_athlete_profile = AsyncMock(return_value=True)
-        mock_service.restore_athlete_profile = AsyncMock(return_value=True)
-        mock_service.get_athlete_profile_completion = AsyncMock(return_value={'completion': 85})
-        return mock_service
+        """Mock profile service (stateless stubs shared across the module; reset_mock() before asserting calls)"""
+        return Mock(
+            create_athlete_profile=AsyncMock(return_value=PROFILE_STUB),
+            get_athlete_profile=AsyncMock(return_value=PROFILE_STUB),
+            update_athlete_profile=AsyncMock(return_value={'id': '1', 'name': 'John Updated'}),
+            delete_athlete_profile=AsyncMock(return_value=True),
+            restore_athlete_profile=AsyncMock(return_value=True),
+            get_athlete_profile_completion=AsyncMock(return_value={'completion': 85})
+        )
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def mock_search_service(self):
-        """Mock search service"""
-        mock_service = Mock()
-        mock_service.search_athletes = AsyncMock(return_value=Mock(count=1, results=[{'id': '1'}]))
-        mock_service.get_athletes_by_sport_category = AsyncMock(return_value=Mock(count=1, results=[{'id': '1'}]))
-        mock_service.get_athletes_by_location = AsyncMock(return_value=Mock(count=1, results=[{'id': '1'}]))
-        mock_service.get_athletes_by_age_range = AsyncMock(return_value=Mock(count=1, results=[{'id': '1'}]))
-        mock_service.get_active_athletes_count = AsyncMock(return_value=100)
-        return mock_service
+        """Mock search service (stateless stubs shared across the module; reset_mock() before asserting calls)"""
+        return Mock(
+            search_athletes=AsyncMock(return_value=SEARCH_RESULT_STUB),
+            get_athletes_by_sport_category=AsyncMock(return_value=SEARCH_RESULT_STUB),
+            get_athletes_by_location=AsyncMock(return_value=SEARCH_RESULT_STUB),
+            get_athletes_by_age_range=AsyncMock(return_value=SEARCH_RESULT_STUB),
+            get_active_athletes_count=AsyncMock(return_value=100)
+        )
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def mock_recommendation_service(self):
-        """Mock recommendation service"""
-        mock_service = Mock()
-        mock_service.get_recommended_athletes = AsyncMock(return_value=[{'id': '1', 'name': 'John'}])
-        mock_service.get_athletes_by_preferences = AsyncMock(return_value=[{'id': '1', 'name': 'John'}])
-        mock_service.get_similar_athletes = AsyncMock(return_value=[{'id': '2', 'name': 'Jane'}])
-        return mock_service
+        """Mock recommendation service (stateless stubs shared across the module; reset_mock() before asserting calls)"""
+        return Mock(
+            get_recommended_athletes=AsyncMock(return_value=[PROFILE_STUB]),
+            get_athletes_by_preferences=AsyncMock(return_value=[PROFILE_STUB]),
+            get_similar_athletes=AsyncMock(return_value=[{'id': '2', 'name': 'Jane'}])
+        )
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def mock_analytics_service(self):
-        """Mock analytics service"""
-        mock_service = Mock()
-        mock_service.get_athlete_analytics = AsyncMock(return_value=Mock(profile_views=10))
-        mock_service.get_athlete_statistics = AsyncMock(return_value={'total_athletes': 100})
-        mock_service.bulk_update_athletes = AsyncMock(return_value={'updated': 5})
-        mock_service.get_athlete_media = AsyncMock(return_value=[{'id': '1', 'type': 'image'}])
-        mock_service.get_athlete_stats = AsyncMock(return_value=[{'id': '1', 'stat': '100m'}])
-        mock_service.get_active_athletes_count = AsyncMock(return_value=100)
-        return mock_service
+        """Mock analytics service (stateless stubs shared across the module; reset_mock() before asserting calls)"""
+        return Mock(
+            get_athlete_analytics=AsyncMock(return_value=SimpleNamespace(profile_views=10)),
+            get_athlete_statistics=AsyncMock(return_value={'total_athletes': 100}),
+            bulk_update_athletes=AsyncMock(return_value={'updated': 5}),
+            get_athlete_media=AsyncMock(return_value=[{'id': '1', 'type': 'image'}]),
+            get_athlete_stats=AsyncMock(return_value=[{'id': '1', 'stat': '100m'}]),
+            get_active_athletes_count=AsyncMock(return_value=100)
+        )
+    
+    @pytest.fixture
+    def service(self, athlete_service_module, mock_config):
+        """AthleteService built against mock_config with empty placeholder sub-services"""
+        self.mock_get_config.return_value = mock_config
+        self.mock_profile.return_value = SimpleNamespace()
+        self.mock_search.return_value = SimpleNamespace()
+        self.mock_recommendation.return_value = SimpleNamespace()
+        self.mock_analytics.return_value = SimpleNamespace()
+        return athlete_service_module.AthleteService()
     
-    @patch('app.services.athlete_service.get_athlete_config')
-    @patch('app.services.athlete_service.AthleteProfileService')
-    @patch('app.services.athlete_service.AthleteSearchService')
-    @patch('app.services.athlete_service.AthleteRecommendationService')
-    @patch('app.services.athlete_service.AthleteAnalyticsService')
-    def test_init_with_performance_monitor(self, mock_analytics, mock_recommendation, mock_search, mock_profile, mock_get_config, mock_config):
+    def test_init_with_performance_monitor(self, athlete_service_module, mock_config):
         """Test service initialization with PerformanceMonitor"""
-        mock_get_config.return_value = mock_config
-        mock_profile.return_value = Mock()
-        mock_search.return_value = Mock()
-        mock_recommendation.return_value = Mock()
-        mock_analytics.return_value = Mock()
+        self.mock_get_config.return_value = mock_config
+        self.mock_profile.return_value = SimpleNamespace()
+        self.mock_search.return_value = SimpleNamespace()
+        self.mock_recommendation.return_value = SimpleNamespace()
+        self.mock_analytics.return_value = SimpleNamespace()
         
-        service = AthleteService()
+        service = athlete_service_module.AthleteService()
         
         assert service.config == mock_config
         assert isinstance(service.performance_monitor, PerformanceMonitor)
@@ -107,48 +210,28 @@ class TestAthleteService:
         assert service.recommendation_service is not None
         assert service.analytics_service is not None
     
-    @patch('app.services.athlete_service.get_athlete_config')
-    def test_init_with_missing_config(self, mock_get_config):
+    def test_init_with_missing_config(self, athlete_service_module):
         """Test service initialization with missing configuration"""
-        mock_get_config.return_value = {'collections': {}}
+        self.mock_get_config.return_value = {'collections': {}}
         
         with pytest.raises(ValueError, match="Missing required configuration keys"):
-            AthleteService()
+            athlete_service_module.AthleteService()
     
-    @patch('app.services.athlete_service.get_athlete_config')
-    @patch('app.services.athlete_service.AthleteProfileService')
-    @patch('app.services.athlete_service.AthleteSearchService')
-    @patch('app.services.athlete_service.AthleteRecommendationService')
-    @patch('app.services.athlete_service.AthleteAnalyticsService')
-    def test_performance_monitor_threshold_configuration(self, mock_analytics, mock_recommendation, mock_search, mock_profile, mock_get_config, mock_config):
+    def test_performance_monitor_threshold_configuration(self, athlete_service_module, mock_config, max_threshold_ms):
         """Test PerformanceMonitor is configured with correct thresholds"""
-        mock_get_config.return_value = mock_config
-        mock_profile.return_value = Mock()
-        mock_search.return_value = Mock()
-        mock_recommendation.return_value = Mock()
-        mock_analytics.return_value = Mock()
+        self.mock_get_config.return_value = mock_config
+        self.mock_profile.return_value = SimpleNamespace()
+        self.mock_search.return_value = SimpleNamespace()
+        self.mock_recommendation.return_value = SimpleNamespace()
+        self.mock_analytics.return_value = SimpleNamespace()
         
-        service = AthleteService()
+        service = athlete_service_module.AthleteService()
         
         # Check that PerformanceMonitor is initialized with the maximum threshold
-        max_threshold = max(AthleteServiceConfig.SLOW_OPERATION_THRESHOLDS.values())
-        assert service.performance_monitor.threshold_ms == max_threshold
+        assert service.performance_monitor.threshold_ms == max_threshold_ms
     
-    @patch('app.services.athlete_service.get_athlete_config')
-    @patch('app.services.athlete_service.AthleteProfileService')
-    @patch('app.services.athlete_service.AthleteSearchService')
-    @patch('app.services.athlete_service.AthleteRecommendationService')
-    @patch('app.services.athlete_service.AthleteAnalyticsService')
-    def test_get_performance_metrics(self, mock_analytics, mock_recommendation, mock_search, mock_profile, mock_get_config, mock_config):
+    def test_get_performance_metrics(self, service):
         """Test performance metrics retrieval"""
-        mock_get_config.return_value = mock_config
-        mock_profile.return_value = Mock()
-        mock_search.return_value = Mock()
-        mock_recommendation.return_value = Mock()
-        mock_analytics.return_value = Mock()
-        
-        service = AthleteService()
-        
         # Mock the performance monitor methods
         service.performance_monitor.get_metrics = Mock(return_value={'test': 'metrics'})
         service.performance_monitor.get_slow_operations = Mock(return_value={'slow': 'ops'})
@@ -163,279 +246,71 @@ class TestAthleteService:
         assert metrics['slow_operations'] == {'slow': 'ops'}
         assert metrics['performance_report'] == 'Performance Report'
     
-    @patch('app.services.athlete_service.get_athlete_config')
-    @patch('app.services.athlete_service.AthleteProfileService')
-    @patch('app.services.athlete_service.AthleteSearchService')
-    @patch('app.services.athlete_service.AthleteRecommendationService')
-    @patch('app.services.athlete_service.AthleteAnalyticsService')
-    @pytest.mark.asyncio
-    async def test_profile_operations_with_performance_monitoring(self, mock_analytics, mock_recommendation, mock_search, mock_profile, mock_get_config, mock_config):
-        """Test profile operations with PerformanceMonitor integration"""
-        mock_get_config.return_value = mock_config
-        mock_profile.return_value = mock_profile_service()
-        mock_search.return_value = Mock()
-        mock_recommendation.return_value = Mock()
-        mock_analytics.return_value = Mock()
-        
-        service = AthleteService()
-        
-        # Test profile creation
-        profile_data = AthleteProfileCreate(
-            first_name="John",
-            last_name="Doe",
-            date_of_birth=datetime(2000, 1, 1).date(),
-            gender="male",
-            location="NYC",
-            primary_sport_category_id="football",
-            position="forward",
-            height_cm=180,
-            weight_kg=75
-        )
-        
-        result = await service.create_athlete_profile("user123", profile_data)
-        assert result['id'] == '1'
-        assert result['name'] == 'John'
-        
-        # Verify PerformanceMonitor has metrics for this operation
-        metrics = service.performance_monitor.get_metrics()
-        assert 'profile_creation' in metrics
-    
-    @patch('app.services.athlete_service.get_athlete_config')
-    @patch('app.services.athlete_service.AthleteProfileService')
-    @patch('app.services.athlete_service.AthleteSearchService')
-    @patch('app.services.athlete_service.AthleteRecommendationService')
-    @patch('app.services.athlete_service.AthleteAnalyticsService')
-    @pytest.mark.asyncio
-    async def test_search_operations_with_performance_monitoring(self, mock_analytics, mock_recommendation, mock_search, mock_profile, mock_get_config, mock_config):
-        """Test search operations with PerformanceMonitor integration"""
-        mock_get_config.return_value = mock_config
-        mock_profile.return_value = Mock()
-        mock_search.return_value = mock_search_service()
-        mock_recommendation.return_value = Mock()
-        mock_analytics.return_value = Mock()
-        
-        service = AthleteService()
-        
-        # Test search athletes
-        filters = AthleteSearchFilters(limit=20, offset=0)
-        result = await service.search_athletes(filters)
-        assert result.count == 1
-        
-        # Test get athletes by sport category
-        result = await service.get_athletes_by_sport_category("football", limit=10)
-        assert result.count == 1
-        
-        # Verify PerformanceMonitor has metrics for these operations
-        metrics = service.performance_monitor.get_metrics()
-        assert 'search_operation' in metrics
-        assert 'sport_category_query' in metrics
-    
-    @patch('app.services.athlete_service.get_athlete_config')
-    @patch('app.services.athlete_service.AthleteProfileService')
-    @patch('app.services.athlete_service.AthleteSearchService')
-    @patch('app.services.athlete_service.AthleteRecommendationService')
-    @patch('app.services.athlete_service.AthleteAnalyticsService')
-    @pytest.mark.asyncio
-    async def test_recommendation_operations_with_performance_monitoring(self, mock_analytics, mock_recommendation, mock_search, mock_profile, mock_get_config, mock_config):
-        """Test recommendation operations with PerformanceMonitor integration"""
-        mock_get_config.return_value = mock_config
-        mock_profile.return_value = Mock()
-        mock_search.return_value = Mock()
-        mock_recommendation.return_value = mock_recommendation_service()
-        mock_analytics.return_value = Mock()
-        
-        service = AthleteService()
-        
-        # Test get recommended athletes
-        result = await service.get_recommended_athletes("scout123", limit=10)
-        assert len(result) == 1
-        assert result[0]['name'] == 'John'
-        
-        # Test get athletes by preferences
-        preferences = {'sport': 'football', 'position': 'forward'}
-        result = await service.get_athletes_by_preferences(preferences, limit=10)
-        assert len(result) == 1
-        
-        # Verify PerformanceMonitor has metrics for these operations
-        metrics = service.performance_monitor.get_metrics()
-        assert 'recommendation_query' in metrics
-        assert 'preference_query' in metrics
-    
-    @patch('app.services.athlete_service.get_athlete_config')
-    @patch('app.services.athlete_service.AthleteProfileService')
-    @patch('app.services.athlete_service.AthleteSearchService')
-    @patch('app.services.athlete_service.AthleteRecommendationService')
-    @patch('app.services.athlete_service.AthleteAnalyticsService')
-    @pytest.mark.asyncio
-    async def test_analytics_operations_with_performance_monitoring(self, mock_analytics, mock_recommendation, mock_search, mock_profile, mock_get_config, mock_config):
-        """Test analytics operations with PerformanceMonitor integration"""
-        mock_get_config.return_value = mock_config
-        mock_profile.return_value = Mock()
-        mock_search.return_value = Mock()
-        mock_recommendation.return_value = Mock()
-        mock_analytics.return_value = mock_analytics_service()
-        
-        service = AthleteService()
-        
-        # Test get athlete analytics
-        result = await service.get_athlete_analytics("athlete123")
-        assert result.profile_views == 10
-        
-        # Test get athlete statistics
-        result = await service.get_athlete_statistics()
-        assert result['total_athletes'] == 100
-        
-        # Test bulk update
-        updates = [{'id': '1', 'update': 'data'}]
-        result = await service.bulk_update_athletes(updates)
-        assert result['updated'] == 5
+    @pytest.mark.parametrize("attribute, sub_service, invoke, expected_metrics", [
+        ("profile_service", "mock_profile_service", _profile_calls, {'profile_creation'}),
+        ("search_service", "mock_search_service", _search_calls, {'search_operation', 'sport_category_query'}),
+        ("recommendation_service", "mock_recommendation_service", _recommendation_calls,
+         {'recommendation_query', 'preference_query'}),
+        ("analytics_service", "mock_analytics_service", _analytics_calls,
+         {'analytics_query', 'statistics_query', 'bulk_operation'}),
+    ], ids=["profile", "search", "recommendation", "analytics"])
+    async def test_operations_with_performance_monitoring(self, request, service, attribute, sub_service, invoke, expected_metrics):
+        """Test sub-service operations are recorded by PerformanceMonitor"""
+        setattr(service, attribute, request.getfixturevalue(sub_service))
+        
+        await invoke(service)
         
         # Verify PerformanceMonitor has metrics for these operations
         metrics = service.performance_monitor.get_metrics()
-        assert 'analytics_query' in metrics
-        assert 'statistics_query' in metrics
-        assert 'bulk_operation' in metrics
+        assert expected_metrics.issubset(metrics)
     
-    @patch('app.services.athlete_service.get_athlete_config')
-    @patch('app.services.athlete_service.AthleteProfileService')
-    @patch('app.services.athlete_service.AthleteSearchService')
-    @patch('app.services.athlete_service.AthleteRecommendationService')
-    @patch('app.services.athlete_service.AthleteAnalyticsService')
-    def test_service_config(self, mock_analytics, mock_recommendation, mock_search, mock_profile, mock_get_config, mock_config):
+    def test_service_config(self, athlete_service_module, service):
         """Test service configuration retrieval"""
-        mock_get_config.return_value = mock_config
-        mock_profile.return_value = Mock()
-        mock_search.return_value = Mock()
-        mock_recommendation.return_value = Mock()
-        mock_analytics.return_value = Mock()
-        
-        service = AthleteService()
-        
         config = service.get_service_config()
         
         assert config['environment'] == 'production'  # Since enable_caching is True
-        assert 'profile_service' in config['services']
-        assert 'search_service' in config['services']
-        assert 'recommendation_service' in config['services']
-        assert 'analytics_service' in config['services']
-        assert 'performance' in config
-        assert 'limits' in config
-        assert 'thresholds' in config
-        assert 'default_limits' in config
-        assert config['thresholds'] == AthleteServiceConfig.SLOW_OPERATION_THRESHOLDS
-        assert config['default_limits'] == AthleteServiceConfig.DEFAULT_LIMITS
+        assert SUB_SERVICES <= config['services'].keys()
+        assert {'performance', 'limits', 'thresholds', 'default_limits'} <= config.keys()
+        service_config = athlete_service_module.AthleteServiceConfig
+        assert config['thresholds'] == service_config.SLOW_OPERATION_THRESHOLDS
+        assert config['default_limits'] == service_config.DEFAULT_LIMITS
     
-    @patch('app.services.athlete_service.get_athlete_config')
-    @patch('app.services.athlete_service.AthleteProfileService')
-    @patch('app.services.athlete_service.AthleteSearchService')
-    @patch('app.services.athlete_service.AthleteRecommendationService')
-    @patch('app.services.athlete_service.AthleteAnalyticsService')
-    @pytest.mark.asyncio
-    async def test_health_check(self, mock_analytics, mock_recommendation, mock_search, mock_profile, mock_get_config, mock_config):
+    async def test_health_check(self, service, mock_profile_service, mock_search_service, mock_analytics_service):
         """Test health check functionality"""
-        mock_get_config.return_value = mock_config
-        mock_profile.return_value = mock_profile_service()
-        mock_search.return_value = mock_search_service()
-        mock_recommendation.return_value = Mock()
-        mock_analytics.return_value = mock_analytics_service()
-        
-        service = AthleteService()
+        service.profile_service = mock_profile_service
+        service.search_service = mock_search_service
+        service.analytics_service = mock_analytics_service
         
         health = await service.health_check()
         
-        assert 'status' in health
-        assert 'timestamp' in health
-        assert 'services' in health
-        assert 'profile_service' in health['services']
-        assert 'search_service' in health['services']
-        assert 'recommendation_service' in health['services']
-        assert 'analytics_service' in health['services']
+        assert {'status', 'timestamp', 'services'} <= health.keys()
+        assert SUB_SERVICES <= health['services'].keys()
     
-    @patch('app.services.athlete_service.get_athlete_config')
-    @patch('app.services.athlete_service.AthleteProfileService')
-    @patch('app.services.athlete_service.AthleteSearchService')
-    @patch('app.services.athlete_service.AthleteRecommendationService')
-    @patch('app.services.athlete_service.AthleteAnalyticsService')
-    def test_validation_decorators(self, mock_analytics, mock_recommendation, mock_search, mock_profile, mock_get_config, mock_config):
+    @pytest.mark.parametrize("call, match", [
+        (lambda s: s.create_athlete_profile("", SAMPLE_PROFILE), "user_id cannot be empty"),
+        (lambda s: s.get_athlete_by_id(""), "athlete_id cannot be empty"),
+        (lambda s: s.get_athletes_by_sport_category("football", limit=0), "limit must be between 1 and 100"),
+        (lambda s: s.get_athletes_by_sport_category("football", offset=-1), "offset cannot be negative"),
+        (lambda s: s.get_athletes_by_age_range(25, 20), "min_age cannot be greater than max_age"),
+        (lambda s: s.bulk_update_athletes([]), "updates list cannot be empty"),
+        (lambda s: s.get_athletes_by_preferences({}), "preferences cannot be empty"),
+        (lambda s: s.search_athletes(None), "filters cannot be None"),
+    ], ids=["user_id", "athlete_id", "limit", "offset", "age_range", "bulk_updates", "preferences", "filters"])
+    async def test_validation_decorators(self, service, call, match):
         """Test validation decorators still work correctly"""
-        mock_get_config.return_value = mock_config
-        mock_profile.return_value = Mock()
-        mock_search.return_value = Mock()
-        mock_recommendation.return_value = Mock()
-        mock_analytics.return_value = Mock()
-        
-        service = AthleteService()
-        
-        # Test user_id validation
-        with pytest.raises(ValueError, match="user_id cannot be empty"):
-            service.create_athlete_profile("", AthleteProfileCreate(
-                first_name="John",
-                last_name="Doe",
-                date_of_birth=datetime(2000, 1, 1).date(),
-                gender="male",
-                location="NYC",
-                primary_sport_category_id="football",
-                position="forward",
-                height_cm=180,
-                weight_kg=75
-            ))
-        
-        # Test athlete_id validation
-        with pytest.raises(ValueError, match="athlete_id cannot be empty"):
-            service.get_athlete_by_id("")
-        
-        # Test pagination validation
-        with pytest.raises(ValueError, match="limit must be between 1 and 100"):
-            service.get_athletes_by_sport_category("football", limit=0)
-        
-        with pytest.raises(ValueError, match="offset cannot be negative"):
-            service.get_athletes_by_sport_category("football", offset=-1)
-        
-        # Test age range validation
-        with pytest.raises(ValueError, match="min_age cannot be greater than max_age"):
-            service.get_athletes_by_age_range(25, 20)
-        
-        # Test bulk operations validation
-        with pytest.raises(ValueError, match="updates list cannot be empty"):
-            service.bulk_update_athletes([])
-        
-        # Test preferences validation
-        with pytest.raises(ValueError, match="preferences cannot be empty"):
-            service.get_athletes_by_preferences({})
-        
-        # Test filters validation
-        with pytest.raises(ValueError, match="filters cannot be None"):
-            service.search_athletes(None)
+        # The validators wrap coroutines, so they raise when awaited
+        with pytest.raises(ValueError, match=match):
+            await call(service)
     
-    @patch('app.services.athlete_service.get_athlete_config')
-    @patch('app.services.athlete_service.AthleteProfileService')
-    @patch('app.services.athlete_service.AthleteSearchService')
-    @patch('app.services.athlete_service.AthleteRecommendationService')
-    @patch('app.services.athlete_service.AthleteAnalyticsService')
-    def test_performance_monitor_integration(self, mock_analytics, mock_recommendation, mock_search, mock_profile, mock_get_config, mock_config):
+    def test_performance_monitor_integration(self, service):
         """Test that PerformanceMonitor is properly integrated and accessible"""
-        mock_get_config.return_value = mock_config
-        mock_profile.return_value = Mock()
-        mock_search.return_value = Mock()
-        mock_recommendation.return_value = Mock()
-        mock_analytics.return_value = Mock()
-        
-        service = AthleteService()
-        
         # Verify PerformanceMonitor instance exists and has expected methods
-        assert hasattr(service.performance_monitor, 'get_metrics')
-        assert hasattr(service.performance_monitor, 'get_slow_operations')
-        assert hasattr(service.performance_monitor, 'generate_report')
-        assert hasattr(service.performance_monitor, 'reset_metrics')
-        
-        # Test that metrics start empty
-        initial_metrics = service.performance_monitor.get_metrics()
-        assert initial_metrics == {}
+        expected_methods = {'get_metrics', 'get_slow_operations', 'generate_report', 'reset_metrics'}
+        assert expected_methods <= set(dir(service.performance_monitor))
         
-        # Test that we can reset metrics
+        # A fresh monitor starts empty, and stays empty after a reset
         service.performance_monitor.reset_metrics()
-        reset_metrics = service.performance_monitor.get_metrics()
-        assert reset_metrics == {}
+        assert service.performance_monitor.get_metrics() == {}
 
 
 if __name__ == "__main__":
@@ -1,22 +1,68 @@
+import inspect
 import pytest
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import patch
 from datetime import datetime, timedelta
+from types import MappingProxyType
 
+from app.services import audit_service as _audit_mod
 from app.services.audit_service import (
-    AuditService, AuditEvent, AuditAction, AuditLevel
+    AuditService, AuditEvent, AuditLevel
 )
 
+# Fixed clock for event timestamps and report windows; the audit_db is mocked,
+# so nothing compares these against the real time
+NOW = datetime(2024, 1, 15)
 
-@pytest.fixture
+_BASE_EVENT_KW = MappingProxyType(dict(
+    user_id="user1",
+    action="CREATE",
+    resource_type="athlete_profile",
+    resource_id="profile1",
+    timestamp=NOW
+))
+
+
+def make_event(**overrides):
+    """Build an AuditEvent from the base fields, replacing any given as overrides"""
+    return AuditEvent(**{**_BASE_EVENT_KW, **overrides})
+
+
+# Rows returned by audit_db.query in the passthrough getter tests
+MOCK_EVENTS = (
+    {"id": "audit1", "action": "CREATE", "timestamp": "2024-01-01T00:00:00"},
+    {"id": "audit2", "action": "UPDATE", "timestamp": "2024-01-02T00:00:00"},
+)
+
+# Taken before the fixture patches DatabaseService, so stubs can still check call arguments
+_QUERY_SIGNATURE = inspect.signature(_audit_mod.DatabaseService.query)
+
+
+def query_returning(value):
+    """Plain coroutine standing in for audit_db.query in tests that never inspect its calls"""
+    async def _query(*args, **kwargs):
+        _QUERY_SIGNATURE.bind(None, *args, **kwargs)
+        return value
+    return _query
+
+
+@pytest.fixture(scope="module")
 def mock_audit_service():
-    """Mock audit service for testing"""
-    with patch('app.services.audit_service.DatabaseService') as mock_db:
-        service = AuditService()
-        service.audit_db = mock_db.return_value
-        yield service
+    """Mock audit service for testing, built once per module; see _reset_audit_mocks"""
+    db_patcher = patch.object(_audit_mod, 'DatabaseService', autospec=True)
+    mock_db = db_patcher.start()
+    service = AuditService()
+    service.audit_db = mock_db.return_value
+    yield service
+    db_patcher.stop()
 
 
-@pytest.fixture
+@pytest.fixture(autouse=True)
+def _reset_audit_mocks(mock_audit_service):
+    """Clear calls, return values and side effects left on the shared audit_db by the previous test"""
+    mock_audit_service.audit_db.reset_mock(return_value=True, side_effect=True)
+
+
+@pytest.fixture(scope="session")
 def sample_audit_event():
     """Sample audit event for testing"""
     return AuditEvent(
@@ -24,7 +70,7 @@ def sample_audit_event():
         action="CREATE",
         resource_type="athlete_profile",
         resource_id="profile123",
-        timestamp=datetime.utcnow(),
+        timestamp=NOW,
         level=AuditLevel.MEDIUM,
         ip_address="192.168.1.1",
         user_agent="Mozilla/5.0",
@@ -52,31 +98,6 @@ class TestAuditService:
         assert "authentication" in mock_audit_service.audit_categories
         assert "opportunities" in mock_audit_service.audit_categories
     
-    def test_audit_action_enum_values(self):
-        """Test audit action enum values"""
-        assert AuditAction.CREATE.value == "CREATE"
-        assert AuditAction.UPDATE.value == "UPDATE"
-        assert AuditAction.DELETE.value == "DELETE"
-        assert AuditAction.LOGIN.value == "LOGIN"
-        assert AuditAction.LOGIN_FAILED.value == "LOGIN_FAILED"
-    
-    def test_audit_level_enum_values(self):
-        """Test audit level enum values"""
-        assert AuditLevel.LOW.value == "LOW"
-        assert AuditLevel.MEDIUM.value == "MEDIUM"
-        assert AuditLevel.HIGH.value == "HIGH"
-        assert AuditLevel.CRITICAL.value == "CRITICAL"
-    
-    def test_audit_event_dataclass(self, sample_audit_event):
-        """Test audit event dataclass structure"""
-        assert sample_audit_event.user_id == "user123"
-        assert sample_audit_event.action == "CREATE"
-        assert sample_audit_event.resource_type == "athlete_profile"
-        assert sample_audit_event.resource_id == "profile123"
-        assert sample_audit_event.level == AuditLevel.MEDIUM
-        assert sample_audit_event.ip_address == "192.168.1.1"
-    
-    @pytest.mark.asyncio
     async def test_log_event_success(self, mock_audit_service, sample_audit_event):
         """Test successful audit event logging"""
         mock_audit_service.audit_db.create.return_value = "audit123"
@@ -86,23 +107,15 @@ class TestAuditService:
         assert result == "audit123"
         mock_audit_service.audit_db.create.assert_called_once()
     
-    @pytest.mark.asyncio
     async def test_log_event_validation_failure(self, mock_audit_service):
         """Test audit event validation failure"""
-        invalid_event = AuditEvent(
-            user_id="",  # Invalid: empty user_id
-            action="CREATE",
-            resource_type="athlete_profile",
-            resource_id="profile123",
-            timestamp=datetime.utcnow()
-        )
+        invalid_event = make_event(user_id="")  # Invalid: empty user_id
         
         result = await mock_audit_service.log_event(invalid_event)
         
         assert result is None
         mock_audit_service.audit_db.create.assert_not_called()
     
-    @pytest.mark.asyncio
     async def test_log_event_database_error(self, mock_audit_service, sample_audit_event):
         """Test audit event logging with database error"""
         mock_audit_service.audit_db.create.side_effect = Exception("Database error")
@@ -111,56 +124,28 @@ class TestAuditService:
         
         assert result is None
     
-    @pytest.mark.asyncio
-    async def test_log_batch_events_success(self, mock_audit_service):
-        """Test successful batch audit event logging"""
-        events = [
-            AuditEvent(
-                user_id="user1",
-                action="CREATE",
-                resource_type="athlete_profile",
-                resource_id="profile1",
-                timestamp=datetime.utcnow()
-            ),
-            AuditEvent(
-                user_id="user2",
-                action="UPDATE",
-                resource_type="athlete_profile",
-                resource_id="profile2",
-                timestamp=datetime.utcnow()
-            )
-        ]
+    @pytest.mark.parametrize("batch_size", [2, 100, 1000])
+    async def test_log_batch_events_success(self, mock_audit_service, batch_size):
+        """Test successful batch audit event logging, including batches beyond config["batch_size"]"""
+        events = [make_event(resource_id=f"profile{i}") for i in range(batch_size)]
         
-        mock_audit_service.audit_db.create.side_effect = ["audit1", "audit2"]
+        mock_audit_service.audit_db.create.side_effect = (f"audit{i}" for i in range(batch_size))
         
         result = await mock_audit_service.log_batch_events(events)
         
-        assert result["successful"] == 2
+        assert result["successful"] == batch_size
         assert result["failed"] == 0
-        assert result["total"] == 2
+        assert result["total"] == batch_size
         assert len(result["errors"]) == 0
     
-    @pytest.mark.asyncio
     async def test_log_batch_events_partial_failure(self, mock_audit_service):
         """Test batch audit event logging with partial failures"""
         events = [
-            AuditEvent(
-                user_id="user1",
-                action="CREATE",
-                resource_type="athlete_profile",
-                resource_id="profile1",
-                timestamp=datetime.utcnow()
-            ),
-            AuditEvent(
-                user_id="user2",
-                action="UPDATE",
-                resource_type="athlete_profile",
-                resource_id="profile2",
-                timestamp=datetime.utcnow()
-            )
+            make_event(),
+            make_event(user_id="user2", action="UPDATE", resource_id="profile2")
         ]
         
-        mock_audit_service.audit_db.create.side_effect = ["audit1", Exception("Database error")]
+        mock_audit_service.audit_db.create.side_effect = (v for v in ["audit1", Exception("Database error")])
         
         result = await mock_audit_service.log_batch_events(events)
         
@@ -169,65 +154,44 @@ class TestAuditService:
         assert result["total"] == 2
         assert len(result["errors"]) == 1
     
-    @pytest.mark.asyncio
-    async def test_get_user_activity_success(self, mock_audit_service):
-        """Test getting user activity successfully"""
-        mock_events = [
-            {"id": "audit1", "action": "CREATE", "timestamp": "2024-01-01T00:00:00"},
-            {"id": "audit2", "action": "UPDATE", "timestamp": "2024-01-02T00:00:00"}
-        ]
-        
-        mock_audit_service.audit_db.query.return_value = mock_events
-        
-        result = await mock_audit_service.get_user_activity("user123", limit=10)
-        
-        assert len(result) == 2
-        assert result[0]["action"] == "CREATE"
-        assert result[1]["action"] == "UPDATE"
-    
-    @pytest.mark.asyncio
-    async def test_get_resource_history_success(self, mock_audit_service):
-        """Test getting resource history successfully"""
-        mock_history = [
-            {"id": "audit1", "action": "CREATE", "timestamp": "2024-01-01T00:00:00"},
-            {"id": "audit2", "action": "UPDATE", "timestamp": "2024-01-02T00:00:00"}
-        ]
-        
-        mock_audit_service.audit_db.query.return_value = mock_history
+    @pytest.mark.parametrize("method,args", [
+        ("get_user_activity", ("user123",)),
+        ("get_resource_history", ("athlete_profile", "profile123")),
+        ("export_audit_logs", (NOW - timedelta(days=7), NOW)),
+    ])
+    async def test_query_passthrough(self, mock_audit_service, monkeypatch, method, args):
+        """Test audit getters return the audit_db.query results unchanged"""
+        monkeypatch.setattr(mock_audit_service.audit_db, "query", query_returning(MOCK_EVENTS))
         
-        result = await mock_audit_service.get_resource_history("athlete_profile", "profile123")
+        result = await getattr(mock_audit_service, method)(*args)
         
-        assert len(result) == 2
-        assert result[0]["action"] == "CREATE"
-        assert result[1]["action"] == "UPDATE"
+        assert result == MOCK_EVENTS
     
-    @pytest.mark.asyncio
-    async def test_get_suspicious_activity_success(self, mock_audit_service):
+    async def test_get_suspicious_activity_success(self, mock_audit_service, monkeypatch):
         """Test getting suspicious activity successfully"""
         mock_events = [
             {"id": "audit1", "user_id": "user1", "action": "CREATE", "timestamp": "2024-01-01T00:00:00", "level": "MEDIUM"},
             {"id": "audit2", "user_id": "user1", "action": "CREATE", "timestamp": "2024-01-01T01:00:00", "level": "MEDIUM"}
         ]
         
-        mock_audit_service.audit_db.query.return_value = mock_events
+        monkeypatch.setattr(mock_audit_service.audit_db, "query", query_returning(mock_events))
         
         result = await mock_audit_service.get_suspicious_activity(time_window_hours=24, threshold=1)
         
         assert len(result) > 0
         assert "suspicious_reason" in result[0]
     
-    @pytest.mark.asyncio
-    async def test_get_audit_summary_success(self, mock_audit_service):
+    async def test_get_audit_summary_success(self, mock_audit_service, monkeypatch):
         """Test getting audit summary successfully"""
         mock_events = [
             {"id": "audit1", "action": "CREATE", "level": "MEDIUM", "user_id": "user1"},
             {"id": "audit2", "action": "UPDATE", "level": "MEDIUM", "user_id": "user2"}
         ]
         
-        mock_audit_service.audit_db.query.return_value = mock_events
+        monkeypatch.setattr(mock_audit_service.audit_db, "query", query_returning(mock_events))
         
-        start_date = datetime.utcnow() - timedelta(days=7)
-        end_date = datetime.utcnow()
+        start_date = NOW - timedelta(days=7)
+        end_date = NOW
         
         result = await mock_audit_service.get_audit_summary(start_date, end_date)
         
@@ -236,26 +200,6 @@ class TestAuditService:
         assert "level_distribution" in result
         assert "user_activity" in result
     
-    @pytest.mark.asyncio
-    async def test_export_audit_logs_success(self, mock_audit_service):
-        """Test exporting audit logs successfully"""
-        mock_logs = [
-            {"id": "audit1", "action": "CREATE", "timestamp": "2024-01-01T00:00:00"},
-            {"id": "audit2", "action": "UPDATE", "timestamp": "2024-01-02T00:00:00"}
-        ]
-        
-        mock_audit_service.audit_db.query.return_value = mock_logs
-        
-        start_date = datetime.utcnow() - timedelta(days=7)
-        end_date = datetime.utcnow()
-        
-        result = await mock_audit_service.export_audit_logs(start_date, end_date)
-        
-        assert len(result) == 2
-        assert result[0]["action"] == "CREATE"
-        assert result[1]["action"] == "UPDATE"
-    
-    @pytest.mark.asyncio
     async def test_cleanup_old_logs_success(self, mock_audit_service):
         """Test cleaning up old audit logs successfully"""
         mock_old_logs = [
@@ -263,16 +207,17 @@ class TestAuditService:
             {"id": "old2", "timestamp": "2023-01-02T00:00:00"}
         ]
         
-        mock_audit_service.audit_db.query.return_value = mock_old_logs
-        mock_audit_service.audit_db.delete.return_value = None
+        mock_audit_service.audit_db.configure_mock(**{
+            "query.return_value": mock_old_logs,
+            "delete.return_value": None
+        })
         
         result = await mock_audit_service.cleanup_old_logs(days_to_keep=30)
         
         assert result == 2
         assert mock_audit_service.audit_db.delete.call_count == 2
     
-    @pytest.mark.asyncio
-    async def test_get_compliance_report_gdpr(self, mock_audit_service):
+    async def test_get_compliance_report_gdpr(self, mock_audit_service, monkeypatch):
         """Test generating GDPR compliance report"""
         mock_events = [
             {"id": "audit1", "action": "READ", "timestamp": "2024-01-01T00:00:00"},
@@ -280,10 +225,10 @@ class TestAuditService:
             {"id": "audit3", "action": "DELETE", "timestamp": "2024-01-03T00:00:00"}
         ]
         
-        mock_audit_service.audit_db.query.return_value = mock_events
+        monkeypatch.setattr(mock_audit_service.audit_db, "query", query_returning(mock_events))
         
-        start_date = datetime.utcnow() - timedelta(days=7)
-        end_date = datetime.utcnow()
+        start_date = NOW - timedelta(days=7)
+        end_date = NOW
         
         result = await mock_audit_service.get_compliance_report(start_date, end_date, "gdpr")
         
@@ -291,43 +236,3 @@ class TestAuditService:
         assert "compliance_metrics" in result
         assert "risk_indicators" in result
         assert "recommendations" in result
-    
-    def test_sanitize_sensitive_data(self, mock_audit_service):
-        """Test sanitizing sensitive data"""
-        test_data = {
-            "username": "john_doe",
-            "password": "secret123",
-            "email": "john@example.com",
-            "token": "abc123",
-            "nested": {
-                "api_key": "xyz789",
-                "normal_field": "value"
-            }
-        }
-        
-        sanitized = mock_audit_service._sanitize_sensitive_data(test_data)
-        
-        assert sanitized["username"] == "john_doe"
-        assert sanitized["password"] == "[REDACTED]"
-        assert sanitized["email"] == "john@example.com"
-        assert sanitized["token"] == "[REDACTED]"
-        assert sanitized["nested"]["api_key"] == "[REDACTED]"
-        assert sanitized["nested"]["normal_field"] == "value"
-    
-    def test_validate_audit_event_valid(self, mock_audit_service, sample_audit_event):
-        """Test validating valid audit event"""
-        result = mock_audit_service._validate_audit_event(sample_audit_event)
-        assert result is True
-    
-    def test_validate_audit_event_invalid(self, mock_audit_service):
-        """Test validating invalid audit event"""
-        invalid_event = AuditEvent(
-            user_id="",  # Invalid: empty user_id
-            action="CREATE",
-            resource_type="athlete_profile",
-            resource_id="profile123",
-            timestamp=datetime.utcnow()
-        )
-        
-        result = mock_audit_service._validate_audit_event(invalid_event)
-        assert result is False 
\ No newline at end of file
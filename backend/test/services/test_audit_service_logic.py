@@ -0,0 +1,97 @@
+"""
+Tests for the AuditService logic that never reaches the audit database:
+enums, event validation and sensitive-data sanitization
+"""
+import pytest
+from dataclasses import replace
+from datetime import datetime
+
+from app.services.audit_service import (
+    AuditService, AuditEvent, AuditAction, AuditLevel
+)
+
+SENSITIVE_DATA = {
+    "username": "john_doe",
+    "password": "secret123",
+    "email": "john@example.com",
+    "token": "abc123",
+    "nested": {
+        "api_key": "xyz789",
+        "normal_field": "value"
+    }
+}
+
+EXPECTED_SANITIZED = {
+    "username": "john_doe",
+    "password": "[REDACTED]",
+    "email": "john@example.com",
+    "token": "[REDACTED]",
+    "nested": {
+        "api_key": "[REDACTED]",
+        "normal_field": "value"
+    }
+}
+
+
+@pytest.fixture(scope="session")
+def audit_service():
+    """Real AuditService; DatabaseService only stores the collection name, so no patching is needed"""
+    return AuditService()
+
+
+@pytest.fixture(scope="session")
+def sample_audit_event():
+    """Sample audit event for testing"""
+    return AuditEvent(
+        user_id="user123",
+        action="CREATE",
+        resource_type="athlete_profile",
+        resource_id="profile123",
+        timestamp=datetime(2024, 1, 15),
+        level=AuditLevel.MEDIUM,
+        ip_address="192.168.1.1",
+        user_agent="Mozilla/5.0",
+        details={"profile_data": {"name": "John Doe"}},
+        before_state={},
+        after_state={"id": "profile123", "name": "John Doe"}
+    )
+
+
+class TestAuditServiceLogic:
+    """Test cases for AuditService logic without database interaction"""
+    
+    def test_audit_action_enum_values(self):
+        """Test audit action enum values"""
+        expected = {"CREATE": "CREATE", "UPDATE": "UPDATE", "DELETE": "DELETE",
+                    "LOGIN": "LOGIN", "LOGIN_FAILED": "LOGIN_FAILED"}
+        assert {action.name: action.value for action in AuditAction}.items() >= expected.items()
+    
+    def test_audit_level_enum_values(self):
+        """Test audit level enum values"""
+        expected = {"LOW": "LOW", "MEDIUM": "MEDIUM", "HIGH": "HIGH", "CRITICAL": "CRITICAL"}
+        assert {level.name: level.value for level in AuditLevel}.items() >= expected.items()
+    
+    def test_audit_event_dataclass(self, sample_audit_event):
+        """Test audit event dataclass structure"""
+        assert sample_audit_event.user_id == "user123"
+        assert sample_audit_event.action == "CREATE"
+        assert sample_audit_event.resource_type == "athlete_profile"
+        assert sample_audit_event.resource_id == "profile123"
+        assert sample_audit_event.level == AuditLevel.MEDIUM
+        assert sample_audit_event.ip_address == "192.168.1.1"
+    
+    def test_sanitize_sensitive_data(self, audit_service):
+        """Test sanitizing sensitive data"""
+        assert audit_service._sanitize_sensitive_data(SENSITIVE_DATA) == EXPECTED_SANITIZED
+    
+    def test_validate_audit_event_valid(self, audit_service, sample_audit_event):
+        """Test validating valid audit event"""
+        result = audit_service._validate_audit_event(sample_audit_event)
+        assert result is True
+    
+    def test_validate_audit_event_invalid(self, audit_service, sample_audit_event):
+        """Test validating invalid audit event"""
+        invalid_event = replace(sample_audit_event, user_id="")  # Invalid: empty user_id
+        
+        result = audit_service._validate_audit_event(invalid_event)
+        assert result is False
@@ -1,303 +1,215 @@
+import asyncio
+import re
+
 import pytest
-from unittest.mock import AsyncMock, MagicMock
-from datetime import datetime, timedelta
+from types import MappingProxyType, SimpleNamespace
+from datetime import datetime, timezone
 
 from app.services.auth_service import AuthService
-from app.api.exceptions import (
-    ValidationError, AuthenticationError, AuthorizationError,
-    ResourceNotFoundError, RateLimitError
-)
+from app.api.exceptions import ValidationError, AuthenticationError, RateLimitError
+
+# Shared, read-only registration payloads
+DEFAULT_USER = MappingProxyType({
+    "email": "test@example.com",
+    "password": "password123",
+    "role": "athlete"
+})
+DUPLICATE_USER = MappingProxyType({**DEFAULT_USER, "email": "duplicate@example.com"})
+
+# Any instant safely in the past, as a JWT "exp" claim
+EXPIRED_TS = int(datetime(2020, 1, 1, tzinfo=timezone.utc).timestamp())
+TOKEN_EXPIRED_RE = re.compile(r"Token expired")
+
+
+async def _expect_failed_login(service):
+    """Attempt a login that must be rejected as unauthenticated"""
+    with pytest.raises(AuthenticationError):
+        await service.login_user("test@example.com", "wrong_password")
+
+
+@pytest.fixture(scope="module")
+def auth_service():
+    """AuthService built once per module; _attach_mock_auth wires in each test's mock_auth"""
+    return AuthService()
+
+
+@pytest.fixture(autouse=True)
+def _attach_mock_auth(auth_service, mock_auth):
+    """Point the shared service at this test's mock_auth with no state left from earlier tests"""
+    mock_auth.reset_mock(return_value=True, side_effect=True)
+    auth_service.auth = mock_auth
 
 
 class TestAuthService:
     """Test cases for AuthService"""
     
-    @pytest.mark.asyncio
-    async def test_register_user(self, mock_auth):
+    @pytest.fixture
+    def failing_verify(self, mock_auth):
+        """mock_auth whose ID-token verification always fails"""
+        mock_auth.verify_id_token.side_effect = Exception("Invalid credentials")
+        return mock_auth
+    
+    async def test_register_user(self, auth_service, mock_auth):
         """Test user registration"""
-        service = AuthService()
-        service.auth = mock_auth
-        
-        user_data = {
-            "email": "test@example.com",
-            "password": "password123",
-            "role": "athlete"
-        }
-        
         # Mock successful user creation
-        mock_user = AsyncMock()
-        mock_user.uid = "user123"
-        mock_user.email = "test@example.com"
-        mock_auth.create_user.return_value = mock_user
+        mock_auth.create_user.return_value = SimpleNamespace(uid="user123", email="test@example.com")
         
-        result = await service.register_user(user_data)
+        result = await auth_service.register_user(DEFAULT_USER)
         
         assert result is not None
         assert result["uid"] == "user123"
         assert result["email"] == "test@example.com"
         mock_auth.create_user.assert_called_once()
     
-    @pytest.mark.asyncio
-    async def test_register_user_duplicate_email(self, mock_auth):
+    async def test_register_user_duplicate_email(self, auth_service, mock_auth):
         """Test user registration with duplicate email"""
-        service = AuthService()
-        service.auth = mock_auth
-        
-        user_data = {
-            "email": "duplicate@example.com",
-            "password": "password123",
-            "role": "athlete"
-        }
-        
         # Mock email already exists error
         mock_auth.create_user.side_effect = Exception("Email already exists")
         
         with pytest.raises(ValidationError):
-            await service.register_user(user_data)
+            await auth_service.register_user(DUPLICATE_USER)
     
-    @pytest.mark.asyncio
-    async def test_login_user(self, mock_auth):
+    async def test_login_user(self, auth_service, mock_auth):
         """Test user login"""
-        service = AuthService()
-        service.auth = mock_auth
-        
         # Mock successful login
         mock_auth.verify_id_token.return_value = {
             "uid": "test_user_id",
             "email": "test@example.com"
         }
         
-        result = await service.login_user("test@example.com", "password123")
+        result = await auth_service.login_user("test@example.com", "password123")
         
         assert result["uid"] == "test_user_id"
         assert result["email"] == "test@example.com"
         assert "access_token" in result
         assert "refresh_token" in result
     
-    @pytest.mark.asyncio
-    async def test_login_user_invalid_credentials(self, mock_auth):
-        """Test login with invalid credentials"""
-        service = AuthService()
-        service.auth = mock_auth
-        
-        # Mock authentication failure
-        mock_auth.verify_id_token.side_effect = Exception("Invalid credentials")
-        
-        with pytest.raises(AuthenticationError):
-            await service.login_user("test@example.com", "wrong_password")
-    
-    @pytest.mark.asyncio
-    async def test_verify_token(self, mock_auth):
+    async def test_verify_token(self, auth_service, mock_auth):
         """Test token verification"""
-        service = AuthService()
-        service.auth = mock_auth
-        
         mock_auth.verify_id_token.return_value = {
             "uid": "test_user_id",
             "email": "test@example.com",
             "role": "athlete"
         }
         
-        result = await service.verify_token("valid_token")
+        result = await auth_service.verify_token("valid_token")
         
         assert result["uid"] == "test_user_id"
         assert result["email"] == "test@example.com"
         assert result["role"] == "athlete"
     
-    @pytest.mark.asyncio
-    async def test_verify_token_invalid(self, mock_auth):
-        """Test invalid token verification"""
-        service = AuthService()
-        service.auth = mock_auth
-        
-        mock_auth.verify_id_token.side_effect = Exception("Invalid token")
-        
+    @pytest.mark.parametrize("call", [
+        lambda service: service.login_user("test@example.com", "wrong_password"),
+        lambda service: service.verify_token("invalid_token"),
+    ], ids=["login_invalid_credentials", "verify_token_invalid"])
+    async def test_rejected_credentials(self, auth_service, failing_verify, call):
+        """Test Firebase verification failures surface as AuthenticationError"""
         with pytest.raises(AuthenticationError):
-            await service.verify_token("invalid_token")
+            await call(auth_service)
     
-    @pytest.mark.asyncio
-    async def test_refresh_token(self, mock_auth):
+    async def test_refresh_token(self, auth_service, mock_auth):
         """Test token refresh"""
-        service = AuthService()
-        service.auth = mock_auth
-        
         # Mock successful token refresh
         mock_auth.verify_id_token.return_value = {
             "uid": "test_user_id",
             "email": "test@example.com"
         }
         
-        result = await service.refresh_token("valid_refresh_token")
+        result = await auth_service.refresh_token("valid_refresh_token")
         
         assert "access_token" in result
         assert "refresh_token" in result
         assert result["access_token"] != "valid_refresh_token"
     
-    @pytest.mark.asyncio
-    async def test_change_password(self, mock_auth):
-        """Test password change"""
-        service = AuthService()
-        service.auth = mock_auth
-        
-        # Mock successful password change
-        mock_auth.update_user.return_value = AsyncMock()
-        
-        result = await service.change_password("user123", "new_password")
-        
-        assert result["message"] == "Password changed successfully"
-        mock_auth.update_user.assert_called_once()
-    
-    @pytest.mark.asyncio
-    async def test_send_verification_email(self, mock_auth):
-        """Test sending verification email"""
-        service = AuthService()
-        service.auth = mock_auth
-        
-        # Mock email verification
-        mock_auth.generate_email_verification_link.return_value = "https://verification-link.com"
-        
-        result = await service.send_verification_email("test@example.com")
-        
-        assert result["message"] == "Verification email sent"
-        mock_auth.generate_email_verification_link.assert_called_once()
-    
-    @pytest.mark.asyncio
-    async def test_verify_email(self, mock_auth):
+    @pytest.mark.parametrize("method, args, mock_attr, return_value, expected_message", [
+        ("change_password", ("user123", "new_password"), "update_user", None,
+         "Password changed successfully"),
+        ("send_verification_email", ("test@example.com",), "generate_email_verification_link",
+         "https://verification-link.com", "Verification email sent"),
+        ("forgot_password", ("test@example.com",), "generate_password_reset_link",
+         "https://reset-link.com", "Password reset email sent"),
+        ("logout", ("user123",), "revoke_refresh_tokens", None, "Logged out successfully"),
+        ("delete_user", ("user123",), "delete_user", None, "User deleted successfully"),
+    ], ids=["change_password", "send_verification_email", "forgot_password", "logout", "delete_user"])
+    async def test_service_happy_path(self, auth_service, mock_auth, method, args, mock_attr, return_value,
+                                      expected_message):
+        """Test single-call operations return their success message after one Firebase call"""
+        firebase_call = getattr(mock_auth, mock_attr)
+        firebase_call.return_value = return_value
+        
+        result = await getattr(auth_service, method)(*args)
+        
+        assert result["message"] == expected_message
+        firebase_call.assert_called_once()
+    
+    async def test_verify_email(self, auth_service, mock_auth):
         """Test email verification"""
-        service = AuthService()
-        service.auth = mock_auth
-        
         # Mock successful email verification
         mock_auth.verify_id_token.return_value = {
             "uid": "user123",
             "email_verified": True
         }
         
-        result = await service.verify_email("verification_token")
+        result = await auth_service.verify_email("verification_token")
         
         assert result["message"] == "Email verified successfully"
     
-    @pytest.mark.asyncio
-    async def test_forgot_password(self, mock_auth):
-        """Test forgot password"""
-        service = AuthService()
-        service.auth = mock_auth
-        
-        # Mock password reset email
-        mock_auth.generate_password_reset_link.return_value = "https://reset-link.com"
-        
-        result = await service.forgot_password("test@example.com")
-        
-        assert result["message"] == "Password reset email sent"
-        mock_auth.generate_password_reset_link.assert_called_once()
-    
-    @pytest.mark.asyncio
-    async def test_reset_password(self, mock_auth):
+    async def test_reset_password(self, auth_service, mock_auth):
         """Test password reset"""
-        service = AuthService()
-        service.auth = mock_auth
-        
         # Mock successful password reset
         mock_auth.verify_password_reset_code.return_value = "user123"
-        mock_auth.update_user.return_value = AsyncMock()
+        mock_auth.update_user.return_value = None
         
-        result = await service.reset_password("reset_token", "new_password")
+        result = await auth_service.reset_password("reset_token", "new_password")
         
         assert result["message"] == "Password reset successfully"
         mock_auth.update_user.assert_called_once()
     
-    @pytest.mark.asyncio
-    async def test_logout_user(self, mock_auth):
-        """Test user logout"""
-        service = AuthService()
-        service.auth = mock_auth
-        
-        # Mock successful logout (token invalidation)
-        mock_auth.revoke_refresh_tokens.return_value = AsyncMock()
-        
-        result = await service.logout("user123")
-        
-        assert result["message"] == "Logged out successfully"
-        mock_auth.revoke_refresh_tokens.assert_called_once()
-    
-    @pytest.mark.asyncio
-    async def test_delete_user(self, mock_auth):
-        """Test user deletion"""
-        service = AuthService()
-        service.auth = mock_auth
-        
-        # Mock successful user deletion
-        mock_auth.delete_user.return_value = AsyncMock()
-        
-        result = await service.delete_user("user123")
-        
-        assert result["message"] == "User deleted successfully"
-        mock_auth.delete_user.assert_called_once()
-    
-    @pytest.mark.asyncio
-    async def test_update_user_role(self, mock_auth):
+    async def test_update_user_role(self, auth_service, mock_auth):
         """Test updating user role"""
-        service = AuthService()
-        service.auth = mock_auth
-        
         # Mock successful role update
-        mock_auth.set_custom_user_claims.return_value = AsyncMock()
+        mock_auth.set_custom_user_claims.return_value = None
         
-        result = await service.update_user_role("user123", "scout")
+        result = await auth_service.update_user_role("user123", "scout")
         
         assert result["message"] == "User role updated successfully"
         assert result["role"] == "scout"
         mock_auth.set_custom_user_claims.assert_called_once()
     
-    @pytest.mark.asyncio
-    async def test_get_user_by_email(self, mock_auth):
+    async def test_get_user_by_email(self, auth_service, mock_auth):
         """Test getting user by email"""
-        service = AuthService()
-        service.auth = mock_auth
-        
         # Mock user retrieval
-        mock_user = AsyncMock()
-        mock_user.uid = "user123"
-        mock_user.email = "test@example.com"
-        mock_user.email_verified = True
-        mock_auth.get_user_by_email.return_value = mock_user
+        mock_auth.get_user_by_email.return_value = SimpleNamespace(
+            uid="user123", email="test@example.com", email_verified=True
+        )
         
-        result = await service.get_user_by_email("test@example.com")
+        result = await auth_service.get_user_by_email("test@example.com")
         
         assert result["uid"] == "user123"
         assert result["email"] == "test@example.com"
         assert result["email_verified"] is True
     
-    @pytest.mark.asyncio
-    async def test_validate_token_expiry(self, mock_auth):
+    async def test_validate_token_expiry(self, auth_service, mock_auth):
         """Test token expiry validation"""
-        service = AuthService()
-        service.auth = mock_auth
-        
         # Mock expired token
-        expired_time = datetime.now() - timedelta(hours=2)
         mock_auth.verify_id_token.return_value = {
             "uid": "user123",
-            "exp": int(expired_time.timestamp())
+            "exp": EXPIRED_TS
         }
         
-        with pytest.raises(AuthenticationError, match="Token expired"):
-            await service.verify_token("expired_token")
+        with pytest.raises(AuthenticationError, match=TOKEN_EXPIRED_RE):
+            await auth_service.verify_token("expired_token")
     
-    @pytest.mark.asyncio
-    async def test_rate_limit_auth_attempts(self, mock_auth):
+    async def test_rate_limit_auth_attempts(self, failing_verify):
         """Test rate limiting on authentication attempts"""
+        # Own instance: failed logins from other tests must not count towards the limit
         service = AuthService()
-        service.auth = mock_auth
-        
-        # Mock multiple failed attempts
-        mock_auth.verify_id_token.side_effect = Exception("Invalid credentials")
+        service.auth = failing_verify
         
         # Simulate multiple failed login attempts
-        for _ in range(5):
-            with pytest.raises(AuthenticationError):
-                await service.login_user("test@example.com", "wrong_password")
+        await asyncio.gather(*(_expect_failed_login(service) for _ in range(5)))
         
         # Next attempt should be rate limited
         with pytest.raises(RateLimitError):
-            await service.login_user("test@example.com", "wrong_password") 
\ No newline at end of file
+            await service.login_user("test@example.com", "wrong_password")
+
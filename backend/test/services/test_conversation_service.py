@@ -1,50 +1,48 @@
 import pytest
-from unittest.mock import AsyncMock, MagicMock
-from datetime import datetime
+from types import MappingProxyType
 
 from app.services.conversation_service import ConversationService
-from app.api.exceptions import ValidationError, ResourceNotFoundError
+
+# Shared, read-only request payloads
+DEFAULT_CONVERSATION = MappingProxyType({
+    "participants": ("user1", "user2"),
+    "conversation_type": "direct",
+    "title": "Test Conversation"
+})
+DEFAULT_MESSAGE = MappingProxyType({
+    "content": "Hello, how are you?",
+    "message_type": "text"
+})
+
+# Stored messages alternating between two senders, built once; slice what a test needs
+MESSAGE_CORPUS = tuple(
+    {"id": f"msg{i}", "content": f"Message {i}", "sender_id": f"user{(i - 1) % 2 + 1}"}
+    for i in range(1, 1001)
+)
 
 
 class TestConversationService:
     """Test cases for ConversationService"""
     
-    @pytest.mark.asyncio
     async def test_create_conversation(self, mock_conversation_service):
         """Test creating conversation"""
-        conversation_data = {
-            "participants": ["user1", "user2"],
-            "conversation_type": "direct",
-            "title": "Test Conversation"
-        }
-        
-        result = await mock_conversation_service.create_conversation("user1", conversation_data)
+        result = await mock_conversation_service.create_conversation("user1", DEFAULT_CONVERSATION)
         
         assert result is not None
         mock_conversation_service.database_service.create_document.assert_called_once()
     
-    @pytest.mark.asyncio
     async def test_send_message(self, mock_conversation_service):
         """Test sending message"""
-        message_data = {
-            "content": "Hello, how are you?",
-            "message_type": "text"
-        }
-        
         result = await mock_conversation_service.send_message(
-            "conversation123", "user123", message_data
+            "conversation123", "user123", DEFAULT_MESSAGE
         )
         
         assert result is not None
         mock_conversation_service.database_service.create_document.assert_called_once()
     
-    @pytest.mark.asyncio
     async def test_get_messages(self, mock_conversation_service):
         """Test getting messages"""
-        mock_conversation_service.database_service.query_documents.return_value = [
-            {"id": "msg1", "content": "Hello", "sender_id": "user1"},
-            {"id": "msg2", "content": "Hi there", "sender_id": "user2"}
-        ]
+        mock_conversation_service.database_service.query_documents.return_value = list(MESSAGE_CORPUS[:2])
         mock_conversation_service.database_service.count_documents.return_value = 2
         
         result = await mock_conversation_service.get_messages(
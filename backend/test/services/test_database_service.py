@@ -1,13 +1,26 @@
+import asyncio
+
 import pytest
+from google.api_core import exceptions as google_exceptions
 from unittest.mock import AsyncMock, MagicMock, patch
 from datetime import datetime
+from firebase_admin import firestore
 from firebase_admin.firestore import FieldFilter
 
+from app.services import database_service as database_service_module
 from app.services.database_service import DatabaseService
 # Import the exceptions from the service file
 from app.services.database_service import ValidationError, ResourceNotFoundError, DatabaseError, ConnectionError
 
 
+def async_stream(docs):
+    """Mock for AsyncQuery.stream() that yields docs on every call"""
+    async def _stream(*args, **kwargs):
+        for doc in docs:
+            yield doc
+    return MagicMock(side_effect=_stream)
+
+
 class TestDatabaseService:
     """Test cases for DatabaseService"""
     
@@ -19,6 +32,15 @@ class TestDatabaseService:
         service.collection = MagicMock()
         service.max_batch_size = 500
         service.max_query_limit = 1000
+        service.search_fields = ("name", "bio", "age")
+        service.max_token_field_length = 200
+        service.max_in_values = 30
+        service._collection_ref = lambda db: service.collection
+        # Hand out the mocked client instead of a real Firestore AsyncClient
+        service._connection_pool = MagicMock(
+            get_connection=AsyncMock(return_value=service.db),
+            return_connection=AsyncMock()
+        )
         return service
     
     @pytest.fixture
@@ -43,17 +65,23 @@ class TestDatabaseService:
     @pytest.mark.asyncio
     async def test_init_success(self):
         """Test successful DatabaseService initialization"""
-        with patch('app.services.database_service.get_firestore_client') as mock_get_client:
-            mock_client = AsyncMock()
+        with patch('app.services.database_service.get_firestore_async_client') as mock_get_client:
+            mock_client = MagicMock()
             mock_get_client.return_value = mock_client
-            mock_collection = AsyncMock()
-            mock_client.collection.return_value = mock_collection
             
-            service = DatabaseService("test_collection")
+            service_a = DatabaseService("a")
+            service_b = DatabaseService("b")
+            refs = [
+                service._collection_ref(database_service_module._get_or_create_client())
+                for service in (service_a, service_b, service_a)
+            ]
             
-            assert service.collection_name == "test_collection"
-            assert service.max_batch_size == 500
-            assert service.max_query_limit == 1000
+            assert service_a.collection_name == "a"
+            assert service_a.max_batch_size == 500
+            assert service_a.max_query_limit == 1000
+            assert mock_get_client.call_count == 1
+            assert refs[0] is refs[2]
+            assert mock_client.collection.call_count == 2
     
     @pytest.mark.asyncio
     async def test_init_missing_collection_name(self):
@@ -73,7 +101,7 @@ class TestDatabaseService:
         """Test successful document creation"""
         mock_doc = MagicMock()
         mock_doc.id = "doc123"
-        database_service.collection.add = MagicMock(return_value=(None, mock_doc))
+        database_service.collection.add = AsyncMock(return_value=(None, mock_doc))
         
         result = await database_service.create({"name": "Test", "value": 123})
         
@@ -83,7 +111,7 @@ class TestDatabaseService:
     @pytest.mark.asyncio
     async def test_create_with_doc_id(self, database_service):
         """Test document creation with specific ID"""
-        mock_doc_ref = MagicMock()
+        mock_doc_ref = AsyncMock()
         database_service.collection.document = MagicMock(return_value=mock_doc_ref)
         
         result = await database_service.create({"name": "Test"}, "custom_id")
@@ -115,6 +143,12 @@ class TestDatabaseService:
         with pytest.raises(ValidationError, match="Document ID must be a non-empty string"):
             await database_service.create({"name": "Test"}, "")
     
+    @pytest.mark.asyncio
+    async def test_create_blank_doc_id(self, database_service):
+        """Test document creation with a whitespace-only document ID"""
+        with pytest.raises(ValidationError, match="Document ID must be a non-empty string"):
+            await database_service.create({"name": "Test"}, "   ")
+    
     # Test get_by_id method
     @pytest.mark.asyncio
     async def test_get_by_id_success(self, database_service, mock_document_data):
@@ -124,8 +158,8 @@ class TestDatabaseService:
         mock_doc.to_dict.return_value = mock_document_data
         mock_doc.id = "doc123"
         
-        mock_doc_ref = MagicMock()
-        mock_doc_ref.get = MagicMock(return_value=mock_doc)
+        mock_doc_ref = AsyncMock()
+        mock_doc_ref.get = AsyncMock(return_value=mock_doc)
         database_service.collection.document = MagicMock(return_value=mock_doc_ref)
         
         result = await database_service.get_by_id("doc123")
@@ -139,8 +173,8 @@ class TestDatabaseService:
         mock_doc = MagicMock()
         mock_doc.exists = False
         
-        mock_doc_ref = MagicMock()
-        mock_doc_ref.get = MagicMock(return_value=mock_doc)
+        mock_doc_ref = AsyncMock()
+        mock_doc_ref.get = AsyncMock(return_value=mock_doc)
         database_service.collection.document = MagicMock(return_value=mock_doc_ref)
         
         result = await database_service.get_by_id("doc123")
@@ -163,7 +197,7 @@ class TestDatabaseService:
     @pytest.mark.asyncio
     async def test_update_success(self, database_service):
         """Test successful document update"""
-        mock_doc_ref = MagicMock()
+        mock_doc_ref = AsyncMock()
         database_service.collection.document = MagicMock(return_value=mock_doc_ref)
         
         result = await database_service.update("doc123", {"name": "Updated"})
@@ -193,7 +227,7 @@ class TestDatabaseService:
     @pytest.mark.asyncio
     async def test_delete_success(self, database_service):
         """Test successful document deletion"""
-        mock_doc_ref = MagicMock()
+        mock_doc_ref = AsyncMock()
         database_service.collection.document = MagicMock(return_value=mock_doc_ref)
         
         result = await database_service.delete("doc123")
@@ -217,10 +251,11 @@ class TestDatabaseService:
         ]
         
         mock_query = MagicMock()
-        mock_query.stream = MagicMock(return_value=mock_docs)
-        database_service.collection.limit.return_value.offset.return_value = mock_query
+        mock_query.stream = async_stream(mock_docs)
+        database_service.collection.order_by.return_value.start_after.return_value.limit.return_value = mock_query
+        cursor = DatabaseService._encode_cursor(MagicMock(id="doc0"))
         
-        result = await database_service.list_all(10, 0)
+        result = await database_service.list_all(10, cursor=cursor)
         
         assert len(result) == 2
         assert all("id" in doc for doc in result)
@@ -237,6 +272,25 @@ class TestDatabaseService:
         with pytest.raises(ValidationError, match="Offset must be non-negative"):
             await database_service.list_all(10, -1)
     
+    @pytest.mark.asyncio
+    async def test_list_all_invalid_cursor(self, database_service):
+        """Test document listing with a malformed cursor"""
+        with pytest.raises(ValidationError, match="Cursor is invalid"):
+            await database_service.list_all(10, cursor="not-a-cursor")
+    
+    @pytest.mark.asyncio
+    async def test_list_all_offset_with_cursor(self, database_service):
+        """Test document listing rejects offset and cursor together"""
+        cursor = DatabaseService._encode_cursor(MagicMock(id="doc0"))
+        with pytest.raises(ValidationError, match="Offset and cursor cannot be combined"):
+            await database_service.list_all(10, 20, cursor=cursor)
+    
+    def test_cursor_round_trip(self):
+        """Test cursors decode back to the document they were built from"""
+        cursor = DatabaseService._encode_cursor(MagicMock(id="doc42"))
+        
+        assert DatabaseService._decode_cursor(cursor) == "doc42"
+    
     # Test query method
     @pytest.mark.asyncio
     async def test_query_success(self, database_service, mock_document_data):
@@ -248,14 +302,28 @@ class TestDatabaseService:
         ]
         
         mock_query = MagicMock()
-        mock_query.stream = MagicMock(return_value=mock_docs)
-        database_service.collection.where.return_value.limit.return_value.offset.return_value = mock_query
+        mock_query.stream = async_stream(mock_docs)
+        database_service.collection.where.return_value.order_by.return_value.start_after.return_value.limit.return_value = mock_query
+        cursor = DatabaseService._encode_cursor(MagicMock(id="doc0"))
         
-        result = await database_service.query(filters, 10, 0)
+        result = await database_service.query(filters, 10, cursor=cursor)
         
         assert len(result) == 2
         assert all("id" in doc for doc in result)
     
+    @pytest.mark.asyncio
+    async def test_query_without_cursor_keeps_default_order(self, database_service, mock_document_data):
+        """Test querying without a cursor does not add a document ID ordering"""
+        filters = [FieldFilter("age", ">=", 18)]
+        mock_query = MagicMock()
+        mock_query.stream = async_stream([MagicMock(to_dict=lambda: mock_document_data, id="doc1")])
+        database_service.collection.where.return_value.limit.return_value = mock_query
+        
+        result = await database_service.query(filters, 10)
+        
+        assert len(result) == 1
+        database_service.collection.where.return_value.order_by.assert_not_called()
+    
     @pytest.mark.asyncio
     async def test_query_invalid_filters(self, database_service):
         """Test document querying with invalid filters"""
@@ -266,23 +334,18 @@ class TestDatabaseService:
     @pytest.mark.asyncio
     async def test_count_success(self, database_service):
         """Test successful document counting"""
-        mock_docs = [MagicMock() for _ in range(25)]
-        mock_query = MagicMock()
-        mock_query.stream = MagicMock(return_value=mock_docs)
-        database_service.collection.limit.return_value = mock_query
+        database_service.collection.count.return_value.get = AsyncMock(return_value=[[MagicMock(value=25)]])
         
         result = await database_service.count()
         
         assert result == 25
+        database_service.collection.stream.assert_not_called()
     
     @pytest.mark.asyncio
     async def test_count_with_filters(self, database_service):
         """Test document counting with filters"""
         filters = [FieldFilter("name", "==", "test")]
-        mock_docs = [MagicMock() for _ in range(10)]
-        mock_query = MagicMock()
-        mock_query.stream = MagicMock(return_value=mock_docs)
-        database_service.collection.where.return_value.limit.return_value = mock_query
+        database_service.collection.where.return_value.count.return_value.get = AsyncMock(return_value=[[MagicMock(value=10)]])
         
         result = await database_service.count(filters)
         
@@ -301,8 +364,8 @@ class TestDatabaseService:
         mock_doc = MagicMock()
         mock_doc.exists = True
         
-        mock_doc_ref = MagicMock()
-        mock_doc_ref.get = MagicMock(return_value=mock_doc)
+        mock_doc_ref = AsyncMock()
+        mock_doc_ref.get = AsyncMock(return_value=mock_doc)
         database_service.collection.document = MagicMock(return_value=mock_doc_ref)
         
         result = await database_service.exists("doc123")
@@ -315,8 +378,8 @@ class TestDatabaseService:
         mock_doc = MagicMock()
         mock_doc.exists = False
         
-        mock_doc_ref = MagicMock()
-        mock_doc_ref.get = MagicMock(return_value=mock_doc)
+        mock_doc_ref = AsyncMock()
+        mock_doc_ref.get = AsyncMock(return_value=mock_doc)
         database_service.collection.document = MagicMock(return_value=mock_doc_ref)
         
         result = await database_service.exists("doc123")
@@ -334,7 +397,7 @@ class TestDatabaseService:
     async def test_batch_create_success(self, database_service):
         """Test successful batch document creation"""
         documents = [{"name": "Doc1"}, {"name": "Doc2"}]
-        mock_batch = AsyncMock()
+        mock_batch = MagicMock(commit=AsyncMock())
         database_service.db.batch.return_value = mock_batch
         
         result = await database_service.batch_create(documents)
@@ -356,17 +419,61 @@ class TestDatabaseService:
     
     @pytest.mark.asyncio
     async def test_batch_create_too_many_documents(self, database_service):
-        """Test batch creation with too many documents"""
+        """Test batch creation splits more than 500 documents into separate commits"""
         documents = [{"name": f"Doc{i}"} for i in range(501)]
-        with pytest.raises(ValidationError, match="Batch size cannot exceed 500"):
-            await database_service.batch_create(documents)
+        batches = [MagicMock(commit=AsyncMock()), MagicMock(commit=AsyncMock())]
+        database_service.db.batch.side_effect = batches
+        
+        result = await database_service.batch_create(documents)
+        
+        assert len(result) == 501
+        assert [batch.set.call_count for batch in batches] == [500, 1]
+        assert sum(batch.commit.call_count for batch in batches) == 2
+    
+    @pytest.mark.asyncio
+    async def test_batch_create_bounds_concurrent_commits(self, database_service):
+        """Test no more than max_concurrent_commits chunk commits run at once"""
+        database_service.max_batch_size = 1
+        database_service.max_concurrent_commits = 2
+        in_flight = peak = 0
+        
+        async def commit():
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+        
+        database_service.db.batch.side_effect = lambda: MagicMock(commit=commit)
+        
+        result = await database_service.batch_create([{"name": f"Doc{i}"} for i in range(6)])
+        
+        assert len(result) == 6
+        assert peak == 2
+    
+    @pytest.mark.asyncio
+    async def test_batch_create_reports_failed_chunks(self, database_service):
+        """Test a failed chunk is named in the error after the other chunks are written"""
+        database_service.max_batch_size = 1
+        database_service.max_commit_retries = 0
+        batches = [
+            MagicMock(commit=AsyncMock()),
+            MagicMock(commit=AsyncMock(side_effect=google_exceptions.Aborted("contention"))),
+            MagicMock(commit=AsyncMock())
+        ]
+        database_service.db.batch.side_effect = batches
+        
+        with pytest.raises(DatabaseError, match=r"chunks \[1\] of 3"):
+            await database_service.batch_create([{"name": f"Doc{i}"} for i in range(3)])
+        
+        assert all(batch.commit.await_count == 1 for batch in batches)
     
     # Test batch_update method
     @pytest.mark.asyncio
     async def test_batch_update_success(self, database_service):
         """Test successful batch document update"""
         updates = [("doc1", {"name": "Updated1"}), ("doc2", {"name": "Updated2"})]
-        mock_batch = AsyncMock()
+        mock_batch = MagicMock(commit=AsyncMock())
         database_service.db.batch.return_value = mock_batch
         
         result = await database_service.batch_update(updates)
@@ -392,7 +499,7 @@ class TestDatabaseService:
     async def test_batch_delete_success(self, database_service):
         """Test successful batch document deletion"""
         doc_ids = ["doc1", "doc2", "doc3"]
-        mock_batch = AsyncMock()
+        mock_batch = MagicMock(commit=AsyncMock())
         database_service.db.batch.return_value = mock_batch
         
         result = await database_service.batch_delete(doc_ids)
@@ -418,17 +525,54 @@ class TestDatabaseService:
     async def test_search_success(self, database_service):
         """Test successful document search"""
         mock_docs = [
-            MagicMock(to_dict=lambda: {"name": "Football highlights", "id": "doc1"}, id="doc1"),
-            MagicMock(to_dict=lambda: {"name": "Basketball skills", "id": "doc2"}, id="doc2")
+            MagicMock(
+                to_dict=lambda: {"name": "Football highlights", "name_tokens": ["football", "highlights"]},
+                id="doc1"
+            )
         ]
         mock_query = MagicMock()
-        mock_query.stream = MagicMock(return_value=mock_docs)
+        mock_query.stream = async_stream(mock_docs)
         database_service.collection.where.return_value.limit.return_value = mock_query
         
-        result = await database_service.search("name", "football", 10)
+        result = await database_service.search("name", "Football", 10)
+        
+        assert len(result) == 1
+        assert result[0]["id"] == "doc1"
+        search_filter = database_service.collection.where.call_args.kwargs["filter"]
+        assert search_filter.op_string == "array_contains"
+        assert search_filter.value == "football"
+    
+    @pytest.mark.asyncio
+    async def test_search_multi_word_value(self, database_service):
+        """Test search rejects values that span several word tokens"""
+        with pytest.raises(ValidationError, match="Search value must be a single word"):
+            await database_service.search("name", "football highlights", 10)
+    
+    @pytest.mark.asyncio
+    async def test_search_unconfigured_field(self, database_service):
+        """Test search rejects fields that are not tokenized"""
+        with pytest.raises(ValidationError, match="Field 'email' is not searchable"):
+            await database_service.search("email", "john", 10)
+    
+    def test_add_search_tokens(self, database_service):
+        """Test search fields gain lowercase word tokens and other fields do not"""
+        data = {"name": "Football Highlights football", "bio": "x" * 201, "email": "a@b.com"}
+        
+        database_service._add_search_tokens(data)
+        
+        assert data["name_tokens"] == ["football", "highlights"]
+        assert data["bio_tokens"] == []
+        assert "email_tokens" not in data
+        assert "age_tokens" not in data
+    
+    def test_add_search_tokens_clears_stale_tokens(self, database_service):
+        """Test writing a search field as None or deleting it clears its tokens"""
+        data = {"name": None, "bio": firestore.DELETE_FIELD}
+        
+        database_service._add_search_tokens(data)
         
-        assert len(result) >= 1
-        assert any("football" in doc["name"].lower() for doc in result)
+        assert data["name_tokens"] == []
+        assert data["bio_tokens"] is firestore.DELETE_FIELD
     
     @pytest.mark.asyncio
     async def test_search_missing_field(self, database_service):
@@ -448,7 +592,7 @@ class TestDatabaseService:
         """Test successful document retrieval by field"""
         mock_doc = MagicMock(to_dict=lambda: mock_document_data, id="doc123")
         mock_query = MagicMock()
-        mock_query.stream = MagicMock(return_value=[mock_doc])
+        mock_query.stream = async_stream([mock_doc])
         database_service.collection.where.return_value.limit.return_value = mock_query
         
         result = await database_service.get_by_field("name", "test")
@@ -460,7 +604,7 @@ class TestDatabaseService:
     async def test_get_by_field_not_found(self, database_service):
         """Test document retrieval by field when not found"""
         mock_query = MagicMock()
-        mock_query.stream = MagicMock(return_value=[])
+        mock_query.stream = async_stream([])
         database_service.collection.where.return_value.limit.return_value = mock_query
         
         result = await database_service.get_by_field("name", "nonexistent")
@@ -482,7 +626,7 @@ class TestDatabaseService:
             MagicMock(to_dict=lambda: mock_document_data, id="doc2")
         ]
         mock_query = MagicMock()
-        mock_query.stream = MagicMock(return_value=mock_docs)
+        mock_query.stream = async_stream(mock_docs)
         database_service.collection.where.return_value = mock_query
         
         result = await database_service.get_by_field_list("name", ["test1", "test2"])
@@ -491,11 +635,21 @@ class TestDatabaseService:
         assert all("id" in doc for doc in result)
     
     @pytest.mark.asyncio
-    async def test_get_by_field_list_too_many_values(self, database_service):
-        """Test document retrieval by field list with too many values"""
-        values = [f"value{i}" for i in range(11)]
-        with pytest.raises(ValidationError, match="Values list cannot exceed 10 items"):
-            await database_service.get_by_field_list("name", values)
+    async def test_get_by_field_list_too_many_values(self, database_service, mock_document_data):
+        """Test document retrieval by field list shards more than 30 values"""
+        values = [f"value{i}" for i in range(61)]
+        mock_docs = [
+            MagicMock(to_dict=lambda: dict(mock_document_data), id="doc1"),
+            MagicMock(to_dict=lambda: dict(mock_document_data), id="doc1")
+        ]
+        database_service.collection.where.return_value.stream = async_stream(mock_docs)
+        
+        result = await database_service.get_by_field_list("name", values)
+        
+        assert database_service.collection.where.call_count == 3
+        chunk_sizes = [len(call.kwargs["filter"].value) for call in database_service.collection.where.call_args_list]
+        assert chunk_sizes == [30, 30, 1]
+        assert [doc["id"] for doc in result] == ["doc1"]
     
     # Test get_paginated_results method
     @pytest.mark.asyncio
@@ -506,21 +660,21 @@ class TestDatabaseService:
             MagicMock(to_dict=lambda: mock_document_data, id="doc2")
         ]
         mock_query = MagicMock()
-        mock_query.stream = MagicMock(return_value=mock_docs)
-        database_service.collection.where.return_value.limit.return_value.offset.return_value = mock_query
+        mock_query.stream = async_stream(mock_docs)
+        database_service.collection.order_by.return_value.limit.return_value = mock_query
         
         # Mock count method
         database_service.count = AsyncMock(return_value=50)
         
-        result = await database_service.get_paginated_results(limit=20, offset=0)
+        result = await database_service.get_paginated_results(limit=1)
         
         assert "results" in result
         assert "total_count" in result
         assert "has_next" in result
-        assert "has_previous" in result
+        assert "next_cursor" in result
         assert result["total_count"] == 50
         assert result["has_next"] is True
-        assert result["has_previous"] is False
+        assert DatabaseService._decode_cursor(result["next_cursor"]) == "doc1"
     
     # Test error handling
     @pytest.mark.asyncio
@@ -547,8 +701,8 @@ class TestDatabaseService:
         mock_doc.to_dict.return_value = {"id": "doc123", "name": "test"}
         mock_doc.id = "doc123"
         
-        mock_doc_ref = MagicMock()
-        mock_doc_ref.get = MagicMock(return_value=mock_doc)
+        mock_doc_ref = AsyncMock()
+        mock_doc_ref.get = AsyncMock(return_value=mock_doc)
         database_service.collection.document = MagicMock(return_value=mock_doc_ref)
         
         # Should not raise any synchronous blocking errors